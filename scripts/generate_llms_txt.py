@@ -21,6 +21,7 @@ warnings.warn(
 )
 
 import argparse
+import importlib.util
 import re
 import sys
 from collections import defaultdict
@@ -47,6 +48,10 @@ def _ensure_deps():
         sys.exit(1)
 
 
+# Prefer the C-backed lxml tree builder for page titles when it is available
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+
 HEADERS = {"User-Agent": "GEO-Optimizer/1.0 (https://github.com/auriti-labs/geo-optimizer-skill)"}
 
 # Category mapping — URL pattern → section name
@@ -193,7 +198,7 @@ def fetch_page_title(url: str) -> str:
     try:
         session = create_session_with_retry(total_retries=2, backoff_factor=0.5)
         r = session.get(url, headers=HEADERS, timeout=5)
-        soup = BeautifulSoup(r.text, "html.parser")
+        soup = BeautifulSoup(r.text, HTML_PARSER)
         title = soup.find("title")
         if title:
             return title.text.strip()
@@ -410,7 +415,7 @@ def discover_sitemap(base_url: str) -> str:
     return None
 
 
-def main():
+def main() -> int:
     parser = argparse.ArgumentParser(
         description="Generate llms.txt from XML sitemap for GEO optimization",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -463,7 +468,7 @@ Examples:
         else:
             print("\n--- llms.txt ---")
             print(minimal_content)
-        return
+        return 0
 
     # Fetch URLs from sitemap
     print("\n📥 Fetching URLs from sitemap...")
@@ -471,7 +476,7 @@ Examples:
 
     if not urls:
         print("❌ No URLs found in sitemap")
-        sys.exit(1)
+        return 1
 
     print(f"   Total URLs: {len(urls)}")
 
@@ -500,6 +505,8 @@ Examples:
         print("─" * 50)
         print("\n✅ Save with: --output /path/to/public/llms.txt")
 
+    return 0
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
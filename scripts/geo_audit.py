@@ -21,6 +21,7 @@ warnings.warn(
 )
 
 import argparse
+import importlib.util
 import json
 import sys
 from datetime import datetime, timezone
@@ -47,6 +48,10 @@ def _ensure_deps():
         sys.exit(1)
 
 
+# BeautifulSoup tree builder: lxml when installed, the stdlib parser otherwise
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+
 # ─── AI bots that should be listed in robots.txt ──────────────────────────────
 AI_BOTS = {
     "GPTBot": "OpenAI (ChatGPT training)",
@@ -603,7 +608,7 @@ def compute_geo_score(robots: dict, llms: dict, schema: dict, meta: dict, conten
     return min(score, 100)
 
 
-def main():
+def main() -> int:
     parser = argparse.ArgumentParser(
         description="GEO Audit — Check AI search optimization of a website",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -655,9 +660,9 @@ Examples:
             print(json.dumps(error_data, indent=2))
         else:
             print(f"\n❌ ERROR: Unable to reach {base_url}: {err}")
-        sys.exit(1)
+        return 1
 
-    soup = BeautifulSoup(r.text, "html.parser")
+    soup = BeautifulSoup(r.text, HTML_PARSER)
     if not json_mode:
         print(f"   Status: {r.status_code} | Size: {len(r.text):,} bytes")
         if VERBOSE:
@@ -836,8 +841,8 @@ Examples:
         print("  Ref: references/princeton-geo-methods.md for advanced methods")
         print()
 
-    return score
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
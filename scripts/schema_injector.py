@@ -21,11 +21,63 @@ warnings.warn(
 )
 
 import argparse
+import contextlib
+import functools
+import importlib.util
+import io
 import json
+import os
 import re
 import shutil
 import sys
-from typing import Dict, List
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# lxml parses far faster than the pure-Python "html.parser"; fall back when missing
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+# Closing </head> tag, located directly when injecting a schema
+HEAD_CLOSE_RE = re.compile(rb"</head\s*>", re.IGNORECASE)
+
+# Opening <head> tag as written in the source. lxml implies a <head> when
+# <title>/<meta> appear outside one; has_head follows the markup instead,
+# like injection, which refuses pages without a <head>
+HEAD_OPEN_RE = re.compile(r"<head[\s/>]", re.IGNORECASE)
+
+# CSS classes of FAQ containers and of the question inside them
+FAQ_CLASS_RE = re.compile(r"faq|question|qa", re.I)
+QUESTION_CLASS_RE = re.compile(r"question", re.I)
+
+# Tags kept by the strained analyze parse (see _analyze_strainer)
+ANALYZE_TAGS = ["script", "head"]
+
+# Banner line printed around the analysis header
+ANALYSIS_BANNER = "=" * 60
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class InjectResult(namedtuple("InjectResult", ["ok", "script_text", "final_bytes"])):
+    """Outcome of inject_schema_into_html(return_result=True); truthy only on success."""
+
+    __slots__ = ()
+
+    def __bool__(self):
+        return self.ok
+
+
+def dumps_schema(schema_dict: dict) -> str:
+    """Serialize a schema with 2-space indentation (orjson when installed, same output)."""
+    if orjson is not None:
+        return orjson.dumps(schema_dict, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(schema_dict, indent=2, ensure_ascii=False)
+
 
 SCHEMA_TEMPLATES = {
     "website": {
@@ -170,7 +222,7 @@ def fill_template(template: dict, values: dict) -> dict:
 
 def schema_to_html_tag(schema_dict: dict) -> str:
     """Convert a schema dict to an HTML script tag."""
-    json_str = json.dumps(schema_dict, indent=2, ensure_ascii=False)
+    json_str = dumps_schema(schema_dict)
     return f'<script type="application/ld+json">\n{json_str}\n</script>'
 
 
@@ -207,10 +259,10 @@ def extract_faq_from_html(soup) -> List[Dict[str, str]]:
                 faqs.append({"question": question, "answer": answer})
 
     # Pattern 3: Common FAQ class patterns
-    faq_containers = soup.find_all(class_=re.compile(r"faq|question|qa", re.I))
+    faq_containers = soup.find_all(class_=FAQ_CLASS_RE)
     for container in faq_containers:
         # Try to find question (h3, h4, strong, or element with "question" class)
-        q_elem = container.find(["h3", "h4", "strong"]) or container.find(class_=re.compile(r"question", re.I))
+        q_elem = container.find(["h3", "h4", "strong"]) or container.find(class_=QUESTION_CLASS_RE)
         if q_elem:
             question = q_elem.get_text(strip=True)
             # Answer is the rest
@@ -222,22 +274,41 @@ def extract_faq_from_html(soup) -> List[Dict[str, str]]:
     return faqs
 
 
+@functools.lru_cache(maxsize=None)
+def _analyze_strainer():
+    """Return the shared head/script SoupStrainer, built on first use."""
+    from bs4 import SoupStrainer
+
+    return SoupStrainer(ANALYZE_TAGS)
+
+
 def analyze_html_file(file_path: str, verbose: bool = False) -> dict:
     """Analyze an HTML file and return found/missing schemas + extracted data."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    return analyze_html_string(content, verbose=verbose)
+
+
+def analyze_html_string(content: str, verbose: bool = False) -> dict:
+    """Analyze HTML markup already in memory (same result as analyze_html_file)."""
     try:
         from bs4 import BeautifulSoup
     except ImportError:
         print("❌ beautifulsoup4 required: pip install beautifulsoup4")
         sys.exit(1)
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    soup = BeautifulSoup(content, "html.parser")
+    # Without an FAQPage schema the FAQ extractor needs the whole body anyway;
+    # otherwise only <head> and <script> subtrees are built
+    if "FAQPage" in content:
+        soup = BeautifulSoup(content, HTML_PARSER, parse_only=_analyze_strainer())
+    else:
+        soup = BeautifulSoup(content, HTML_PARSER)
 
     # Extract all JSON-LD scripts
     found_schemas = []
-    scripts = soup.find_all("script", type="application/ld+json")
+    scripts = soup.find_all("script", attrs={"type": "application/ld+json"})
+    has_head = HEAD_OPEN_RE.search(content) is not None
 
     for idx, script in enumerate(scripts):
         try:
@@ -275,6 +346,9 @@ def analyze_html_file(file_path: str, verbose: bool = False) -> dict:
     # Extract FAQ if FAQPage is missing
     extracted_faqs = []
     if "FAQPage" not in found_types:
+        if "FAQPage" in content:
+            # "FAQPage" appeared outside a valid JSON-LD block: rebuild the full tree
+            soup = BeautifulSoup(content, HTML_PARSER)
         extracted_faqs = extract_faq_from_html(soup)
 
     # Check for duplicates
@@ -290,7 +364,7 @@ def analyze_html_file(file_path: str, verbose: bool = False) -> dict:
         "missing": missing,
         "extracted_faqs": extracted_faqs,
         "duplicates": duplicates,
-        "has_head": bool(soup.find("head")),
+        "has_head": has_head,
         "total_scripts": len(scripts),
     }
 
@@ -305,7 +379,13 @@ def generate_faq_schema(faq_items: List[Dict[str, str]]) -> dict:
     return schema
 
 
-def inject_schema_into_html(file_path: str, schema_dict: dict, backup: bool = True, validate: bool = True) -> bool:
+def inject_schema_into_html(
+    file_path: str,
+    schema_dict: dict,
+    backup: bool = True,
+    validate: bool = True,
+    return_result: bool = False,
+):
     """
     Inject a schema tag into an HTML file (before </head>).
 
@@ -314,15 +394,19 @@ def inject_schema_into_html(file_path: str, schema_dict: dict, backup: bool = Tr
         schema_dict (dict): Schema dictionary to inject
         backup (bool): Create .bak backup before modifying
         validate (bool): Validate schema before injection (recommended)
+        return_result (bool): Return an InjectResult carrying the injected
+            JSON text and the written bytes, so callers need not re-parse the file
 
     Returns:
-        bool: True if successful, False otherwise
+        bool: True if successful, False otherwise (InjectResult if return_result)
     """
+    failed = InjectResult(False, None, None) if return_result else False
+
     try:
         from bs4 import BeautifulSoup
     except ImportError:
         print("❌ beautifulsoup4 required: pip install beautifulsoup4")
-        return False
+        return failed
 
     # Validate schema before injection (Fix #7)
     if validate:
@@ -341,104 +425,253 @@ def inject_schema_into_html(file_path: str, schema_dict: dict, backup: bool = Tr
         if not is_valid:
             print(f"⚠️  Schema validation failed: {error_msg}")
             print("   Use --no-validate to inject anyway (not recommended)")
-            return False
+            return failed
         print("✅ Schema validation passed")
 
+    # Work on bytes: the splice needs no decode/encode round-trip
+    with open(file_path, "rb") as f:
+        raw = f.read()
+
+    # The tag is written as UTF-8; splicing it into another encoding would
+    # leave a mixed-encoding file, so check before touching anything
+    try:
+        content = raw.decode("utf-8")
+    except UnicodeDecodeError as e:
+        print(f"❌ File is not valid UTF-8 ({e.reason} at byte {e.start}); convert it to UTF-8 first")
+        return failed
+
     # Backup (copy, not move — preserves original if injection fails)
     if backup:
         backup_path = f"{file_path}.bak"
-        shutil.copy2(file_path, backup_path)
+        create_backup(file_path, backup_path)
         print(f"📁 Backup created: {backup_path}")
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    soup = BeautifulSoup(content, "html.parser")
-    head = soup.find("head")
+    script_text = "\n" + dumps_schema(schema_dict) + "\n"
+    head_closes = list(HEAD_CLOSE_RE.finditer(raw))
+    if len(head_closes) == 1:
+        # Single </head>: splice the tag in without re-serializing the document
+        pos = head_closes[0].start()
+        tag = f'<script type="application/ld+json">{script_text}</script>'
+        raw = raw[:pos] + tag.encode("utf-8") + raw[pos:]
+    else:
+        # Implicit or ambiguous </head>: let the parser locate the real <head>.
+        # html.parser, not lxml: this rewrites the user's file, and lxml would
+        # invent a missing <head> or lose it behind Astro/MD frontmatter
+        soup = BeautifulSoup(content, "html.parser")
+        head = soup.find("head")
 
-    if not head:
-        print("❌ No <head> tag found in HTML")
-        return False
+        if not head:
+            print("❌ No <head> tag found in HTML")
+            return failed
 
-    # Create new schema tag
-    schema_tag = soup.new_tag("script", type="application/ld+json")
-    schema_tag.string = "\n" + json.dumps(schema_dict, indent=2, ensure_ascii=False) + "\n"
+        # Create new schema tag
+        schema_tag = soup.new_tag("script", type="application/ld+json")
+        schema_tag.string = script_text
 
-    # Insert before </head>
-    head.append(schema_tag)
+        # Insert before </head>
+        head.append(schema_tag)
+        raw = str(soup).encode("utf-8")
 
-    # Write back
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(str(soup))
+    # Write back (a hardlinked backup shares the inode, so never truncate it)
+    if backup:
+        replace_file_content(file_path, raw)
+    else:
+        with open(file_path, "wb") as f:
+            f.write(raw)
 
+    if return_result:
+        return InjectResult(True, script_text, raw)
     return True
 
 
+def create_backup(file_path: str, backup_path: str):
+    """Back up a file as a hardlink, falling back to a full copy (other device, FAT, ...)."""
+    source = os.path.realpath(file_path)
+    try:
+        if os.path.lexists(backup_path):
+            os.remove(backup_path)
+        os.link(source, backup_path)
+    except OSError:
+        shutil.copy2(source, backup_path)
+
+
+def replace_file_content(file_path: str, content: bytes):
+    """Write content to a temp file and atomically swap it in, keeping the old inode intact.
+
+    Mode, flags, xattrs/ACLs and (when permitted) owner and group are copied to
+    the new file. Other hard links to the page keep pointing at the old version.
+    """
+    target = os.path.realpath(file_path)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".geo-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        # chown before copystat: changing the owner clears setuid/setgid bits
+        copy_ownership(target, tmp_path)
+        shutil.copystat(target, tmp_path)
+        # copystat also copies atime/mtime; the rewritten page must look new
+        os.utime(tmp_path)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def copy_ownership(source: str, dest: str):
+    """Copy owner and group from source to dest when the process is allowed to."""
+    if not hasattr(os, "chown"):
+        return
+    st = os.stat(source)
+    try:
+        os.chown(dest, st.st_uid, st.st_gid)
+    except OSError:
+        # Unprivileged: keep at least the group, if the user belongs to it
+        try:
+            os.chown(dest, -1, st.st_gid)
+        except OSError:
+            pass
+
+
 def print_analysis(analysis: dict, verbose: bool = False):
-    """Pretty-print analysis results."""
-    print(f"\n{'=' * 60}")
-    print("  SCHEMA ANALYSIS")
-    print(f"{'=' * 60}\n")
+    """Pretty-print analysis results.
+
+    Lines are collected and written with a single sys.stdout.write() call.
+    """
+    out: List[str] = []
+    out.append(f"\n{ANALYSIS_BANNER}")
+    out.append("  SCHEMA ANALYSIS")
+    out.append(f"{ANALYSIS_BANNER}\n")
 
     if analysis["found_schemas"]:
-        print(f"✅ Found {len(analysis['found_schemas'])} schema(s):\n")
+        out.append(f"✅ Found {len(analysis['found_schemas'])} schema(s):\n")
         for idx, schema in enumerate(analysis["found_schemas"], 1):
             schema_type = schema["type"]
             data = schema["data"]
 
-            print(f"   {idx}. {schema_type}")
+            out.append(f"   {idx}. {schema_type}")
 
             # Show key properties
             if schema_type == "WebSite":
-                print(f"      url: {data.get('url', 'N/A')}")
-                print(f"      name: {data.get('name', 'N/A')}")
+                out.append(f"      url: {data.get('url', 'N/A')}")
+                out.append(f"      name: {data.get('name', 'N/A')}")
             elif schema_type == "WebApplication":
-                print(f"      url: {data.get('url', 'N/A')}")
-                print(f"      name: {data.get('name', 'N/A')}")
+                out.append(f"      url: {data.get('url', 'N/A')}")
+                out.append(f"      name: {data.get('name', 'N/A')}")
             elif schema_type == "FAQPage":
                 faq_count = len(data.get("mainEntity", []))
-                print(f"      questions: {faq_count}")
+                out.append(f"      questions: {faq_count}")
             elif schema_type == "Organization":
-                print(f"      name: {data.get('name', 'N/A')}")
+                out.append(f"      name: {data.get('name', 'N/A')}")
             elif schema_type == "BreadcrumbList":
                 items = len(data.get("itemListElement", []))
-                print(f"      items: {items}")
+                out.append(f"      items: {items}")
 
             if verbose:
-                print("\n      Full schema:")
-                print(f"      {json.dumps(data, indent=6, ensure_ascii=False)}\n")
-            print()
+                out.append("\n      Full schema:")
+                out.append(f"      {json.dumps(data, indent=6, ensure_ascii=False)}\n")
+            out.append("")
     else:
-        print("⚠️  No JSON-LD schemas found\n")
+        out.append("⚠️  No JSON-LD schemas found\n")
 
     # Duplicates warning
     if analysis["duplicates"]:
-        print("⚠️  DUPLICATE SCHEMAS DETECTED:\n")
+        out.append("⚠️  DUPLICATE SCHEMAS DETECTED:\n")
         for schema_type, count in analysis["duplicates"].items():
-            print(f"   • {schema_type}: {count} instances (should be 1)")
-        print()
+            out.append(f"   • {schema_type}: {count} instances (should be 1)")
+        out.append("")
 
     # Missing schemas
     if analysis["missing"]:
-        print("💡 Suggested schemas to add:\n")
+        out.append("💡 Suggested schemas to add:\n")
         for schema_type in analysis["missing"]:
-            print(f"   • {schema_type.upper()}")
-        print()
+            out.append(f"   • {schema_type.upper()}")
+        out.append("")
 
     # Extracted FAQs
     if analysis["extracted_faqs"]:
-        print(f"📋 Auto-detected {len(analysis['extracted_faqs'])} FAQ items:\n")
+        out.append(f"📋 Auto-detected {len(analysis['extracted_faqs'])} FAQ items:\n")
         for idx, faq in enumerate(analysis["extracted_faqs"][:3], 1):  # Show first 3
             q = faq["question"][:60] + "..." if len(faq["question"]) > 60 else faq["question"]
-            print(f"   {idx}. {q}")
+            out.append(f"   {idx}. {q}")
         if len(analysis["extracted_faqs"]) > 3:
-            print(f"   ... and {len(analysis['extracted_faqs']) - 3} more")
-        print()
-        print("   💡 Use --type faq --auto-extract --inject to add FAQPage schema")
-        print()
+            out.append(f"   ... and {len(analysis['extracted_faqs']) - 3} more")
+        out.append("")
+        out.append("   💡 Use --type faq --auto-extract --inject to add FAQPage schema")
+        out.append("")
+
+    sys.stdout.write("\n".join(out) + "\n")
 
 
-def main():
+def find_html_files(directory: str) -> List[str]:
+    """Return every .html/.htm file under directory, sorted for stable output."""
+    return sorted(str(p) for p in Path(directory).rglob("*") if p.suffix.lower() in (".html", ".htm") and p.is_file())
+
+
+def _analyze_directory_file(path: str, verbose: bool = False) -> tuple:
+    """Analyze one file for --dir; return (analysis, warnings, error).
+
+    Warnings printed by the analysis are captured and handed back, so the
+    parent prints them under the right file header. A file that cannot be
+    read or decoded yields an error message instead of aborting the run.
+    """
+    captured = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(captured):
+            analysis = analyze_html_file(path, verbose)
+    except (OSError, UnicodeDecodeError) as e:
+        return None, captured.getvalue(), f"{type(e).__name__}: {e}"
+    return analysis, captured.getvalue(), None
+
+
+def analyze_directory(directory: str, verbose: bool = False, jobs: Optional[int] = None) -> int:
+    """Analyze every HTML file under directory, parsing files in a process pool.
+
+    Each worker imports bs4/lxml once and reuses it for all the files it is
+    handed; results are printed in path order by the parent process. Returns
+    1 if any file could not be read.
+    """
+    paths = find_html_files(directory)
+    if not paths:
+        print(f"❌ No HTML files found in {directory}")
+        return 1
+
+    if jobs == 1 or len(paths) == 1:
+        results = [_analyze_directory_file(path, verbose) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(_analyze_directory_file, paths, [verbose] * len(paths)))
+
+    failed = 0
+    for path, (analysis, warnings_text, error) in zip(paths, results):
+        print(f"\n📄 {path}")
+        if warnings_text:
+            sys.stdout.write(warnings_text)
+        if error is not None:
+            failed += 1
+            print(f"❌ Could not analyze file: {error}")
+            continue
+        print_analysis(analysis, verbose=verbose)
+
+    print(f"\n✅ Analyzed {len(paths) - failed} HTML files")
+    if failed:
+        print(f"❌ {failed} file(s) could not be analyzed")
+        return 1
+    return 0
+
+
+def positive_int(value: str) -> int:
+    """argparse type for --jobs: an integer greater than zero."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def main() -> int:
     parser = argparse.ArgumentParser(
         description="Inject JSON-LD schema into HTML pages or generate Astro snippets",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -450,6 +683,9 @@ Examples:
   # Analyze with verbose output (shows full schema JSON)
   ./geo scripts/schema_injector.py --file index.html --analyze --verbose
 
+  # Analyze every HTML file in a build directory (parallel)
+  ./geo scripts/schema_injector.py --dir dist/ --analyze
+
   # Inject WebSite schema
   ./geo scripts/schema_injector.py --file index.html --type website --name "MySite" --url https://example.com --inject
 
@@ -462,6 +698,8 @@ Examples:
     )
 
     parser.add_argument("--file", help="HTML file to analyze/modify")
+    parser.add_argument("--dir", help="Directory of HTML files to analyze (with --analyze)")
+    parser.add_argument("--jobs", type=positive_int, help="Worker processes for --dir (default: CPU count)")
     parser.add_argument("--type", choices=list(SCHEMA_TEMPLATES.keys()), help="Type of schema to generate")
     parser.add_argument("--name", help="Site/application name")
     parser.add_argument("--url", help="Site URL")
@@ -483,23 +721,25 @@ Examples:
 
     # Mode 1: Analyze only
     if args.analyze:
+        if args.dir:
+            return analyze_directory(args.dir, verbose=args.verbose, jobs=args.jobs)
         if not args.file:
-            print("❌ --file required for --analyze")
-            sys.exit(1)
+            print("❌ --file or --dir required for --analyze")
+            return 1
 
         analysis = analyze_html_file(args.file, verbose=args.verbose)
         print_analysis(analysis, verbose=args.verbose)
-        sys.exit(0)
+        return 0
 
     # Mode 2: Generate Astro snippet
     if args.astro:
         if not args.url or not args.name:
             print("❌ --url and --name required for --astro")
-            sys.exit(1)
+            return 1
 
         snippet = ASTRO_TEMPLATE.replace("SITE_URL", args.url).replace("SITE_NAME", args.name)
         print(snippet)
-        sys.exit(0)
+        return 0
 
     # Mode 3: Generate/inject schema
     if args.type:
@@ -511,7 +751,7 @@ Examples:
                 faq_items = analysis["extracted_faqs"]
                 if not faq_items:
                     print("❌ No FAQ items found in HTML")
-                    sys.exit(1)
+                    return 1
                 print(f"✅ Extracted {len(faq_items)} FAQ items")
                 schema = generate_faq_schema(faq_items)
             elif args.faq_file:
@@ -521,7 +761,7 @@ Examples:
                 schema = generate_faq_schema(faq_items)
             else:
                 print("❌ --auto-extract or --faq-file required for FAQ schema")
-                sys.exit(1)
+                return 1
         else:
             # Standard template
             values = {
@@ -537,7 +777,7 @@ Examples:
         if args.inject:
             if not args.file:
                 print("❌ --file required for --inject")
-                sys.exit(1)
+                return 1
 
             success = inject_schema_into_html(
                 args.file, schema, backup=not args.no_backup, validate=not args.no_validate
@@ -546,14 +786,15 @@ Examples:
                 print(f"✅ Schema injected into {args.file}")
             else:
                 print("❌ Failed to inject schema")
-                sys.exit(1)
+                return 1
         else:
             # Print schema JSON
             print(schema_to_html_tag(schema))
+        return 0
     else:
         parser.print_help()
-        sys.exit(1)
+        return 1
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
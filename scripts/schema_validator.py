@@ -19,8 +19,16 @@ warnings.warn(
     stacklevel=1,
 )
 
+import functools
 import json
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Optional, Tuple
+
+# orjson (optional "fast" extra) parses JSON-LD several times faster; its
+# JSONDecodeError subclasses json.JSONDecodeError, so error handling is unchanged
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
 # Required fields for each schema.org type
 SCHEMA_ORG_REQUIRED = {
@@ -36,6 +44,19 @@ SCHEMA_ORG_REQUIRED = {
     "webapplication": ["@context", "@type", "name", "url"],
 }
 
+# Required fields as frozensets: the common all-present case is a single
+# dict-keys superset test; the ordered list is only walked to report what is missing
+REQUIRED_FIELD_SETS = {schema_type: frozenset(fields) for schema_type, fields in SCHEMA_ORG_REQUIRED.items()}
+DEFAULT_REQUIRED_FIELDS = ("@context", "@type")
+DEFAULT_REQUIRED_SET = frozenset(DEFAULT_REQUIRED_FIELDS)
+
+# Accepted @context values (a tuple: list contexts may hold unhashable objects)
+VALID_CONTEXTS = ("https://schema.org", "http://schema.org")
+
+# Fields whose values must look like URLs, and the prefixes that qualify
+URL_FIELDS = ("url", "sameAs", "logo", "image")
+URL_PREFIXES = ("http://", "https://", "/")
+
 
 def validate_jsonld(
     schema_dict: Dict, schema_type: Optional[str] = None, strict: bool = False
@@ -71,13 +92,12 @@ def validate_jsonld(
     if not context:
         return False, "Missing required field: @context"
 
-    valid_contexts = ["https://schema.org", "http://schema.org"]
     if isinstance(context, str):
-        if context not in valid_contexts:
+        if context not in VALID_CONTEXTS:
             return False, f"@context must be 'https://schema.org', got '{context}'"
     elif isinstance(context, list):
         # Multiple contexts — validate first one
-        if not context or context[0] not in valid_contexts:
+        if not context or context[0] not in VALID_CONTEXTS:
             return False, f"@context[0] must be 'https://schema.org', got '{context[0] if context else 'empty list'}'"
     else:
         return False, f"@context must be string or array, got {type(context).__name__}"
@@ -106,15 +126,13 @@ def validate_jsonld(
             return False, f"Expected @type '{schema_type}', got '{primary_type}'"
 
         # Check required fields for this type
-        required_fields = SCHEMA_ORG_REQUIRED.get(schema_type_normalized, ["@context", "@type"])
-        missing_fields = [f for f in required_fields if f not in schema_dict]
-
-        if missing_fields:
+        if not schema_dict.keys() >= REQUIRED_FIELD_SETS.get(schema_type_normalized, DEFAULT_REQUIRED_SET):
+            required_fields = SCHEMA_ORG_REQUIRED.get(schema_type_normalized, DEFAULT_REQUIRED_FIELDS)
+            missing_fields = [f for f in required_fields if f not in schema_dict]
             return False, f"Missing required fields for {primary_type}: {', '.join(missing_fields)}"
 
     # Validate URL fields format (if present)
-    url_fields = ["url", "sameAs", "logo", "image"]
-    for field in url_fields:
+    for field in URL_FIELDS:
         value = schema_dict.get(field)
         if value:
             if isinstance(value, str):
@@ -125,7 +143,7 @@ def validate_jsonld(
                 continue
 
             for url in urls_to_check:
-                if isinstance(url, str) and not url.startswith(("http://", "https://", "/")):
+                if isinstance(url, str) and not url.startswith(URL_PREFIXES):
                     if strict:
                         return (
                             False,
@@ -152,21 +170,25 @@ def validate_jsonld_string(
         tuple: (is_valid, error_message)
     """
     try:
-        schema_dict = json.loads(json_string)
+        schema_dict = json_loads(json_string)
     except json.JSONDecodeError as e:
         return False, f"Invalid JSON: {e}"
 
     return validate_jsonld(schema_dict, schema_type, strict)
 
 
-def get_required_fields(schema_type: str) -> List[str]:
+@functools.lru_cache(maxsize=64)
+def get_required_fields(schema_type: str) -> Tuple[str, ...]:
     """
-    Get list of required fields for a schema type.
+    Get the required fields for a schema type.
+
+    Results are memoized; a tuple is returned so callers cannot mutate the
+    cached value (or, through it, SCHEMA_ORG_REQUIRED).
 
     Args:
         schema_type (str): Schema type (e.g., 'website', 'faqpage')
 
     Returns:
-        list: Required field names
+        tuple: Required field names
     """
-    return SCHEMA_ORG_REQUIRED.get(schema_type.lower(), ["@context", "@type"])
+    return tuple(SCHEMA_ORG_REQUIRED.get(schema_type.lower(), DEFAULT_REQUIRED_FIELDS))
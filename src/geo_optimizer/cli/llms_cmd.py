@@ -13,6 +13,7 @@ from geo_optimizer.core.llms_generator import (
     fetch_sitemap,
     generate_llms_txt,
 )
+from geo_optimizer.utils.http import create_session_with_retry
 from geo_optimizer.utils.validators import validate_public_url
 
 
@@ -39,10 +40,13 @@ def llms(base_url, output, sitemap, site_name, description, fetch_titles, max_pe
     click.echo("\n🌐 GEO llms.txt Generator")
     click.echo(f"   Site: {base_url}")
 
+    # Una sola sessione per robots.txt, sitemap e sub-sitemap: riusa le connessioni keep-alive
+    session = create_session_with_retry()
+
     sitemap_url = sitemap
     if not sitemap_url:
         click.echo("\n🔍 Searching for sitemap...")
-        sitemap_url = discover_sitemap(base_url, on_status=lambda msg: click.echo(f"   {msg}"))
+        sitemap_url = discover_sitemap(base_url, on_status=lambda msg: click.echo(f"   {msg}"), session=session)
 
     if not sitemap_url:
         click.echo("❌ No sitemap found. Specify --sitemap manually.")
@@ -58,7 +62,7 @@ def llms(base_url, output, sitemap, site_name, description, fetch_titles, max_pe
         return
 
     click.echo("\n📥 Fetching URLs from sitemap...")
-    urls = fetch_sitemap(sitemap_url, on_status=lambda msg: click.echo(f"   {msg}"))
+    urls = fetch_sitemap(sitemap_url, on_status=lambda msg: click.echo(f"   {msg}"), session=session)
 
     if not urls:
         click.echo("❌ No URLs found in sitemap")
@@ -9,7 +9,13 @@ operazioni HTTP. Fallback graceful: se rich non è installato,
 :func:`is_rich_available` ritorna False e il CLI usa il testo piatto.
 """
 
-from geo_optimizer.models.config import SCORING
+from geo_optimizer.cli.scoring_helpers import (
+    _content_score,
+    _llms_score,
+    _meta_score,
+    _robots_score,
+    _schema_score,
+)
 from geo_optimizer.models.results import AuditResult
 
 try:
@@ -173,43 +179,3 @@ def format_audit_rich(result: AuditResult) -> str:
 
 def _status_icon(passed: bool) -> str:
     return "✅" if passed else "❌"
-
-
-def _robots_score(r: AuditResult) -> int:
-    if r.robots.citation_bots_ok:
-        return SCORING["robots_found"] + SCORING["robots_citation_ok"]
-    if r.robots.bots_allowed:
-        return SCORING["robots_found"] + SCORING["robots_some_allowed"]
-    if r.robots.found:
-        return SCORING["robots_found"]
-    return 0
-
-
-def _llms_score(r: AuditResult) -> int:
-    s = SCORING["llms_found"] if r.llms.found else 0
-    s += SCORING["llms_h1"] if r.llms.has_h1 else 0
-    s += SCORING["llms_sections"] if r.llms.has_sections else 0
-    s += SCORING["llms_links"] if r.llms.has_links else 0
-    return s
-
-
-def _schema_score(r: AuditResult) -> int:
-    s = SCORING["schema_website"] if r.schema.has_website else 0
-    s += SCORING["schema_faq"] if r.schema.has_faq else 0
-    s += SCORING["schema_webapp"] if r.schema.has_webapp else 0
-    return s
-
-
-def _meta_score(r: AuditResult) -> int:
-    s = SCORING["meta_title"] if r.meta.has_title else 0
-    s += SCORING["meta_description"] if r.meta.has_description else 0
-    s += SCORING["meta_canonical"] if r.meta.has_canonical else 0
-    s += SCORING["meta_og"] if (r.meta.has_og_title and r.meta.has_og_description) else 0
-    return s
-
-
-def _content_score(r: AuditResult) -> int:
-    s = SCORING["content_h1"] if r.content.has_h1 else 0
-    s += SCORING["content_numbers"] if r.content.has_numbers else 0
-    s += SCORING["content_links"] if r.content.has_links else 0
-    return s
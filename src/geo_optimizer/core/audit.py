@@ -12,6 +12,7 @@ from urllib.parse import urljoin, urlparse
 from geo_optimizer.models.config import (  # noqa: F401 (VALUABLE_SCHEMAS re-exported)
     AI_BOTS,
     CITATION_BOTS,
+    HTML_PARSER,
     SCORE_BANDS,
     SCORING,
     VALUABLE_SCHEMAS,
@@ -352,7 +353,7 @@ def run_full_audit(url: str, use_cache: bool = False) -> AuditResult:
         result.recommendations = [f"Unable to reach {base_url}: {err}"]
         return result
 
-    soup = BeautifulSoup(r.text, "html.parser")
+    soup = BeautifulSoup(r.text, HTML_PARSER)
 
     # Run all sub-audits
     robots = audit_robots_txt(base_url)
@@ -416,7 +417,7 @@ async def run_full_audit_async(url: str) -> AuditResult:
         result.recommendations = [f"Unable to reach {base_url}: {err_home}"]
         return result
 
-    soup = BeautifulSoup(r_home.text, "html.parser")
+    soup = BeautifulSoup(r_home.text, HTML_PARSER)
 
     # Sub-audit robots.txt (usa risposta pre-fetched)
     robots = _audit_robots_from_response(r_robots)
@@ -9,14 +9,16 @@ nothing is printed to stdout.  Status updates go through an optional
 import logging
 import re
 from collections import defaultdict
-from typing import Callable, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from typing import Callable, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
-from bs4 import BeautifulSoup
-
 from geo_optimizer.models.config import (
     CATEGORY_PATTERNS,
     HEADERS,
+    HTML_PARSER,
     OPTIONAL_CATEGORIES,
     SECTION_PRIORITY_ORDER,
     SKIP_PATTERNS,
@@ -33,11 +35,177 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 
 _MAX_SITEMAP_DEPTH = 3  # Limite profondità ricorsione sitemap index
+_MAX_SUB_SITEMAPS = 10  # Sub-sitemap seguiti per ogni indice
+
+
+# Namespace accettati per gli elementi della sitemap ("" = nessun namespace),
+# con qualunque prefisso: <url>, <sm:url>. Le estensioni (image:, video:) no.
+_SITEMAP_NAMESPACES = (
+    "http://www.sitemaps.org/schemas/sitemap/0.9",
+    "http://www.google.com/schemas/sitemap/0.9",
+    "http://www.google.com/schemas/sitemap/0.84",
+    "",
+)
+
+
+@lru_cache(maxsize=None)
+def _sitemap_xpaths():
+    """Compila una sola volta le XPath per il parsing della sitemap.
+
+    Il confronto usa local-name() e namespace-uri(): ``<loc>`` e ``<sm:loc>``
+    del namespace sitemap corrispondono, ``<image:loc>`` delle estensioni
+    image/video no (find() di BeautifulSoup li confondeva). lxml viene
+    importato alla prima chiamata.
+    """
+    from lxml import etree
+
+    in_namespace = " or ".join(f"namespace-uri()='{ns}'" for ns in _SITEMAP_NAMESPACES)
+    return {
+        "loc": etree.XPath(f"(.//*[local-name()='loc' and ({in_namespace})])[1]"),
+        "fields": etree.XPath(
+            f".//*[(local-name()='loc' or local-name()='lastmod' or local-name()='priority') and ({in_namespace})]"
+        ),
+    }
+
+
+def _sitemap_namespace(tag: str) -> str:
+    """Namespace di un tag lxml in notazione Clark ("" se assente)."""
+    return tag[1 : tag.index("}")] if tag[0] == "{" else ""
+
+
+def _element_text(element) -> str:
+    """Equivalente lxml di ``Tag.text`` (testo dei discendenti, commenti esclusi)."""
+    if not len(element):
+        # Caso tipico (<loc>testo</loc>): nessun figlio da attraversare
+        return (element.text or "").strip()
+    return "".join(element.itertext()).strip()
+
+
+def _resolve_loc(sitemap_url: str, loc: str) -> str:
+    """``urljoin(sitemap_url, loc)`` senza urljoin per i ``<loc>`` già assoluti.
+
+    Con un netloc presente urljoin restituisce l'URL ricomposto da urlparse,
+    identico all'originale se è ASCII e privo di spazi, ``;?#`` e parentesi
+    quadre (casi che urlparse normalizza). Gli altri passano da urljoin.
+    """
+    if loc.isascii() and loc.startswith(("https://", "http://")):
+        host = loc.index("://") + 3
+        if host < len(loc) and loc[host] != "/" and not any(c in loc for c in "\t\r\n ;?#[]"):
+            return loc
+    return urljoin(sitemap_url, loc)
+
+
+def _sitemap_entry(url_tag, sitemap_url: str, fields_xpath) -> Optional[SitemapUrl]:
+    """Costruisce la voce di un elemento ``<url>``; None se manca ``<loc>``."""
+    # Una sola XPath per <url>: primo loc/lastmod/priority in ordine di documento
+    fields = {}
+    for element in fields_xpath(url_tag):
+        fields.setdefault(element.tag.rpartition("}")[2], element)
+
+    loc = fields.get("loc")
+    if loc is None:
+        return None
+
+    entry = SitemapUrl(
+        url=_resolve_loc(sitemap_url, _element_text(loc)),
+    )
+
+    lastmod = fields.get("lastmod")
+    if lastmod is not None:
+        entry.lastmod = _element_text(lastmod)
+
+    priority = fields.get("priority")
+    if priority is not None:
+        try:
+            entry.priority = float(_element_text(priority))
+        except ValueError:
+            pass
+
+    return entry
+
+
+def _scan_sitemap(content: bytes, sitemap_url: str) -> Tuple[List[Optional[str]], int, List[SitemapUrl]]:
+    """Legge la sitemap in streaming con iterparse.
+
+    Restituisce i ``<loc>`` degli elementi ``<sitemap>`` (None se assente), il
+    numero di elementi ``<url>`` e le relative voci. Ogni elemento viene svuotato
+    e staccato dall'albero appena letto, così la memoria non cresce con il numero
+    di URL. recover=True tollera markup imperfetto come il builder "xml" di
+    BeautifulSoup; entità esterne e accessi di rete restano disabilitati.
+    """
+    from lxml import etree
+
+    xpaths = _sitemap_xpaths()
+    sitemap_locs: List[Optional[str]] = []
+    url_count = 0
+    entries: List[SitemapUrl] = []
+
+    # Contesto per chiamata: i parser lxml non vanno condivisi tra thread
+    context = etree.iterparse(
+        BytesIO(content),
+        events=("end",),
+        tag=("{*}url", "{*}sitemap"),
+        recover=True,
+        resolve_entities=False,
+        no_network=True,
+    )
+    # Riferimenti locali: il ciclo gira una volta per <url>
+    loc_xpath, fields_xpath = xpaths["loc"], xpaths["fields"]
+    add_entry = entries.append
+    try:
+        for _, element in context:
+            # "{*}" accetta qualunque namespace: gli elementi delle estensioni
+            # (es. <image:url>) si saltano senza toccare l'albero
+            if _sitemap_namespace(element.tag) not in _SITEMAP_NAMESPACES:
+                continue
+            if element.tag.endswith("sitemap"):
+                loc = loc_xpath(element)
+                sitemap_locs.append(_element_text(loc[0]) if loc else None)
+            else:
+                url_count += 1
+                entry = _sitemap_entry(element, sitemap_url, fields_xpath)
+                if entry is not None:
+                    add_entry(entry)
+
+            # Rilascia l'elemento letto e i fratelli già elaborati
+            element.clear()
+            parent = element.getparent()
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
+    except etree.XMLSyntaxError:
+        # Documento vuoto o troncato: restano valide le voci lette finora
+        pass
+
+    return sitemap_locs, url_count, entries
+
+
+def _fetch_sub_sitemaps(
+    sub_urls: List[str],
+    on_status: Optional[Callable[[str], None]],
+    depth: int,
+    session,
+) -> List[List[SitemapUrl]]:
+    """Scarica i sub-sitemap di un indice, in parallelo solo al primo livello.
+
+    I download sono indipendenti e I/O-bound: con un pool il tempo totale
+    diventa quello del sub-sitemap più lento invece della somma. ``map``
+    conserva l'ordine dell'indice. Gli indici annidati (depth > 1) restano
+    sequenziali per non moltiplicare i thread (al massimo 10 per livello).
+    Tutti i worker condividono la stessa ``session`` (e il suo pool di
+    connessioni keep-alive).
+    """
+    if len(sub_urls) < 2 or depth > 1:
+        return [fetch_sitemap(u, on_status=on_status, session=session, _depth=depth) for u in sub_urls]
+
+    with ThreadPoolExecutor(max_workers=len(sub_urls)) as pool:
+        return list(pool.map(lambda u: fetch_sitemap(u, on_status=on_status, session=session, _depth=depth), sub_urls))
 
 
 def fetch_sitemap(
     sitemap_url: str,
     on_status: Optional[Callable[[str], None]] = None,
+    session=None,
     _depth: int = 0,
 ) -> List[SitemapUrl]:
     """Download and parse an XML sitemap, including sitemap index files.
@@ -49,6 +217,8 @@ def fetch_sitemap(
     Args:
         sitemap_url: URL of the XML sitemap to fetch.
         on_status: Optional callback for progress messages.
+        session: Optional ``requests.Session`` to reuse (connection pooling);
+            a retrying session is created when omitted.
         _depth: Internal recursion depth counter (non usare direttamente).
 
     Returns:
@@ -68,7 +238,8 @@ def fetch_sitemap(
     logger.info("Fetching sitemap: %s", sitemap_url)
 
     try:
-        session = create_session_with_retry()
+        if session is None:
+            session = create_session_with_retry()
         r = session.get(sitemap_url, headers=HEADERS, timeout=15)
         r.raise_for_status()
     except Exception as e:
@@ -77,18 +248,17 @@ def fetch_sitemap(
             on_status(f"Sitemap error (after retries): {e}")
         return urls
 
-    soup = BeautifulSoup(r.content, "xml")
+    sitemap_locs, url_count, entries = _scan_sitemap(r.content, sitemap_url)
 
     # Sitemap index (contains other sitemaps)
-    sitemap_tags = soup.find_all("sitemap")
-    if sitemap_tags:
-        logger.info("Sitemap index found: %d sitemaps", len(sitemap_tags))
+    if sitemap_locs:
+        logger.info("Sitemap index found: %d sitemaps", len(sitemap_locs))
         if on_status:
-            on_status(f"Sitemap index found: {len(sitemap_tags)} sitemaps")
-        for sitemap in sitemap_tags[:10]:  # Limit to 10 sub-sitemaps
-            loc = sitemap.find("loc")
-            if loc:
-                sub_url = urljoin(sitemap_url, loc.text.strip())
+            on_status(f"Sitemap index found: {len(sitemap_locs)} sitemaps")
+        sub_urls = []
+        for loc_text in sitemap_locs[:_MAX_SUB_SITEMAPS]:
+            if loc_text is not None:
+                sub_url = urljoin(sitemap_url, loc_text)
                 # Validazione anti-SSRF: verifica che sub-URL sia pubblico
                 safe, reason = validate_public_url(sub_url)
                 if not safe:
@@ -96,52 +266,63 @@ def fetch_sitemap(
                     if on_status:
                         on_status(f"Sub-sitemap skipped (unsafe): {sub_url}")
                     continue
-                sub_urls = fetch_sitemap(sub_url, on_status=on_status, _depth=_depth + 1)
-                urls.extend(sub_urls)
+                sub_urls.append(sub_url)
+        for sub_entries in _fetch_sub_sitemaps(sub_urls, on_status, _depth + 1, session):
+            urls.extend(sub_entries)
         return urls
 
     # Regular sitemap
-    url_tags = soup.find_all("url")
-    logger.info("URLs found: %d", len(url_tags))
+    logger.info("URLs found: %d", url_count)
     if on_status:
-        on_status(f"URLs found: {len(url_tags)}")
+        on_status(f"URLs found: {url_count}")
 
-    for url_tag in url_tags:
-        loc = url_tag.find("loc")
-        if not loc:
-            continue
+    return entries
 
-        entry = SitemapUrl(
-            url=urljoin(sitemap_url, loc.text.strip()),
-        )
 
-        lastmod = url_tag.find("lastmod")
-        if lastmod:
-            entry.lastmod = lastmod.text.strip()
+# ---------------------------------------------------------------------------
+# URL filtering & classification
+# ---------------------------------------------------------------------------
 
-        priority = url_tag.find("priority")
-        if priority:
-            try:
-                entry.priority = float(priority.text.strip())
-            except ValueError:
-                pass
 
-        urls.append(entry)
+# Un solo regex per SKIP_PATTERNS: basta che un'alternativa corrisponda
+_SKIP_RE = re.compile("|".join(f"(?:{p})" for p in SKIP_PATTERNS), re.IGNORECASE)
 
-    return urls
+# CATEGORY_PATTERNS è ordinato per priorità (vince il primo pattern trovato in
+# qualunque punto del path), mentre una semplice alternanza vincerebbe per
+# posizione. Ogni alternativa è quindi un lookahead ancorato all'inizio: il
+# motore le prova in ordine e il gruppo vuoto che segue identifica la categoria.
+_CATEGORY_RE = re.compile(
+    "^(?:" + "|".join(f"(?=.*?{p})(?P<c{i}>)" for i, (p, _) in enumerate(CATEGORY_PATTERNS)) + ")",
+    re.IGNORECASE | re.DOTALL,
+)
+_CATEGORY_BY_GROUP = {f"c{i}": category for i, (_, category) in enumerate(CATEGORY_PATTERNS)}
 
 
-# ---------------------------------------------------------------------------
-# URL filtering & classification
-# ---------------------------------------------------------------------------
+def _url_path(url: str) -> str:
+    """``urlparse(url).path`` con un percorso veloce per URL http(s) semplici.
+
+    categorize_url e url_to_label girano una volta per URL della sitemap e
+    usano solo il path. Per URL ASCII senza tab/newline, host IPv6 o
+    ``;params`` basta cercare i separatori; negli altri casi decide urlparse.
+    """
+    if url.isascii() and url.startswith(("https://", "http://")) and not ("\t" in url or "\r" in url or "\n" in url):
+        start = url.index("://") + 3
+        end = len(url)
+        for sep in "?#":
+            pos = url.find(sep, start, end)
+            if pos != -1:
+                end = pos
+        slash = url.find("/", start, end)
+        netloc = url[start:end] if slash == -1 else url[start:slash]
+        path = "" if slash == -1 else url[slash:end]
+        if "[" not in netloc and "]" not in netloc and ";" not in path:
+            return path
+    return urlparse(url).path
 
 
 def should_skip(url: str) -> bool:
     """Check whether *url* should be skipped based on :data:`SKIP_PATTERNS`."""
-    for pattern in SKIP_PATTERNS:
-        if re.search(pattern, url, re.IGNORECASE):
-            return True
-    return False
+    return _SKIP_RE.search(url) is not None
 
 
 def categorize_url(url: str, base_domain: str) -> str:
@@ -154,11 +335,11 @@ def categorize_url(url: str, base_domain: str) -> str:
     Returns:
         Category name string, e.g. ``"Blog & Articles"`` or ``"Main Pages"``.
     """
-    path = urlparse(url).path.lower()
+    path = _url_path(url).lower()
 
-    for pattern, category in CATEGORY_PATTERNS:
-        if re.search(pattern, path, re.IGNORECASE):
-            return category
+    match = _CATEGORY_RE.match(path)
+    if match:
+        return _CATEGORY_BY_GROUP[match.lastgroup]
 
     # Root / homepage
     if path in ["/", ""]:
@@ -177,21 +358,37 @@ def categorize_url(url: str, base_domain: str) -> str:
 # ---------------------------------------------------------------------------
 
 
-def fetch_page_title(url: str) -> Optional[str]:
+@lru_cache(maxsize=None)
+def _title_strainer():
+    """SoupStrainer condiviso per ``fetch_page_title`` (bs4 importato al primo uso).
+
+    Costruisce solo ``<title>`` e ``<h1>``: il resto della pagina viene
+    tokenizzato ma non trasformato in albero.
+    """
+    from bs4 import SoupStrainer
+
+    return SoupStrainer(["title", "h1"])
+
+
+def fetch_page_title(url: str, session=None) -> Optional[str]:
     """Attempt to fetch the ``<title>`` (or ``<h1>``) of a page.
 
     Uses a short timeout and limited retry to avoid blocking on slow pages.
+    Pass ``session`` to reuse pooled connections across many pages.
 
     Returns:
         The page title string, or ``None`` on failure.
     """
+    from bs4 import BeautifulSoup
+
     try:
-        session = create_session_with_retry(total_retries=2, backoff_factor=0.5)
+        if session is None:
+            session = create_session_with_retry(total_retries=2, backoff_factor=0.5)
         r = session.get(url, headers=HEADERS, timeout=5)
         # Non usare titoli da pagine di errore (404, 500, ecc.)
         if r.status_code != 200:
             return None
-        soup = BeautifulSoup(r.text, "html.parser")
+        soup = BeautifulSoup(r.text, HTML_PARSER, parse_only=_title_strainer())
         title = soup.find("title")
         if title:
             return title.text.strip()
@@ -203,6 +400,19 @@ def fetch_page_title(url: str) -> Optional[str]:
     return None
 
 
+def _fetch_page_titles(urls: List[str], max_workers: int) -> List[Optional[str]]:
+    """Scarica i titoli di più pagine in parallelo, nell'ordine di ``urls``.
+
+    Le richieste sono indipendenti e I/O-bound; il pool condivide una
+    sessione con ``pool_maxsize`` pari ai worker, così ogni thread riusa
+    una connessione keep-alive invece di aprirne una nuova per pagina.
+    """
+    workers = max(1, min(max_workers, len(urls)))
+    session = create_session_with_retry(total_retries=2, backoff_factor=0.5, pool_maxsize=workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda u: fetch_page_title(u, session=session), urls))
+
+
 def url_to_label(url: str, base_domain: str) -> str:
     """Generate a human-readable label from a URL.
 
@@ -213,7 +423,7 @@ def url_to_label(url: str, base_domain: str) -> str:
     Returns:
         A title-cased label derived from the URL path.
     """
-    path = urlparse(url).path
+    path = _url_path(url)
     # Remove leading and trailing slashes
     path = path.strip("/")
     if not path:
@@ -241,6 +451,7 @@ def generate_llms_txt(
     description: str = None,
     fetch_titles: bool = False,
     max_urls_per_section: int = 20,
+    max_workers: int = 20,
 ) -> str:
     """Generate the content of an ``llms.txt`` file.
 
@@ -252,6 +463,8 @@ def generate_llms_txt(
         fetch_titles: When ``True``, fetch ``<title>`` from each page
             to use as the link label.  This is slow for large sitemaps.
         max_urls_per_section: Cap on links per section (default 20).
+        max_workers: Concurrent page fetches when ``fetch_titles`` is set
+            (default 20).
 
     Returns:
         The full ``llms.txt`` content as a string.
@@ -268,6 +481,7 @@ def generate_llms_txt(
     # Filter and categorize URLs
     categorized = defaultdict(list)
     seen: set = set()
+    needs_title: List[dict] = []
 
     for url_data in sorted(urls, key=lambda x: -x.priority):
         url = url_data.url
@@ -291,22 +505,25 @@ def generate_llms_txt(
 
         category = categorize_url(url, domain)
 
-        # Generate label (fetch from page if requested)
+        # Generate label (fetched from the page below, if requested)
         label = url_data.title
-        if not label and fetch_titles:
-            fetched = fetch_page_title(url)
-            if fetched:
-                label = fetched
+        item = {
+            "url": url,
+            "label": label,
+            "priority": url_data.priority,
+        }
         if not label:
-            label = url_to_label(url, domain)
+            if fetch_titles:
+                needs_title.append(item)
+            else:
+                item["label"] = url_to_label(url, domain)
+
+        categorized[category].append(item)
 
-        categorized[category].append(
-            {
-                "url": url,
-                "label": label,
-                "priority": url_data.priority,
-            }
-        )
+    if needs_title:
+        titles = _fetch_page_titles([item["url"] for item in needs_title], max_workers)
+        for item, fetched in zip(needs_title, titles):
+            item["label"] = fetched or url_to_label(item["url"], domain)
 
     # Build llms.txt
     lines: List[str] = []
@@ -371,15 +588,58 @@ def generate_llms_txt(
 # ---------------------------------------------------------------------------
 
 
+# Timeout (s) delle probe HEAD parallele sui percorsi di riserva
+_FALLBACK_PROBE_TIMEOUT = 3
+
+
+def _probe_common_paths(session, base_url: str, paths: List[str]) -> Optional[str]:
+    """Prova i percorsi comuni con HEAD; il primo 200 in ordine di priorità vince.
+
+    Il percorso principale viene provato da solo, come prima: nel caso comune
+    parte una sola richiesta. Solo se manca, i percorsi restanti partono insieme
+    (latenza di un round-trip) su una sessione senza retry e con timeout breve,
+    così il risultato non dipende da quale server risponde prima.
+    """
+
+    def _probe(probe_session, path: str, timeout: float) -> Optional[str]:
+        url = urljoin(base_url, path)
+        try:
+            r = probe_session.head(url, headers=HEADERS, timeout=timeout)
+        except Exception:
+            return None
+        return url if r.status_code == 200 else None
+
+    url = _probe(session, paths[0], 5)
+    if url or len(paths) == 1:
+        return url
+
+    rest = paths[1:]
+    fallback_session = create_session_with_retry(total_retries=0, pool_maxsize=len(rest))
+    pool = ThreadPoolExecutor(max_workers=len(rest))
+    try:
+        for url in pool.map(lambda path: _probe(fallback_session, path, _FALLBACK_PROBE_TIMEOUT), rest):
+            if url:
+                return url
+        return None
+    finally:
+        # shutdown(wait=False) restituisce subito il risultato, ma i thread ancora
+        # in volo vengono attesi all'uscita dell'interprete: il timeout breve e
+        # l'assenza di retry limitano quell'attesa a pochi secondi (connessione
+        # e lettura hanno ciascuna _FALLBACK_PROBE_TIMEOUT)
+        pool.shutdown(wait=False)
+
+
 def discover_sitemap(
     base_url: str,
     on_status: Optional[Callable[[str], None]] = None,
+    session=None,
 ) -> Optional[str]:
     """Discover the site's sitemap URL from ``robots.txt`` or common paths.
 
     Args:
         base_url: The site's base URL.
         on_status: Optional callback for progress messages.
+        session: Optional ``requests.Session`` to reuse (connection pooling).
 
     Returns:
         The sitemap URL if found, otherwise ``None``.
@@ -393,7 +653,8 @@ def discover_sitemap(
         "/sitemap-0.xml",
     ]
 
-    session = create_session_with_retry(total_retries=2, backoff_factor=0.5)
+    if session is None:
+        session = create_session_with_retry(total_retries=2, backoff_factor=0.5)
 
     # Controlla robots.txt per la direttiva Sitemap:
     parsed_base = urlparse(base_url)
@@ -421,17 +682,12 @@ def discover_sitemap(
         pass
 
     # Try common paths
-    for path in common_paths:
-        url = urljoin(base_url, path)
-        try:
-            r = session.head(url, headers=HEADERS, timeout=5)
-            if r.status_code == 200:
-                logger.info("Sitemap found: %s", url)
-                if on_status:
-                    on_status(f"Sitemap found: {url}")
-                return url
-        except Exception:
-            continue
+    url = _probe_common_paths(session, base_url, common_paths)
+    if url:
+        logger.info("Sitemap found: %s", url)
+        if on_status:
+            on_status(f"Sitemap found: {url}")
+        return url
 
     logger.warning("No sitemap found automatically for %s", base_url)
     if on_status:
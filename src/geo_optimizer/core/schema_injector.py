@@ -5,14 +5,15 @@ All functions return data; no printing.
 """
 
 import json
+import os
 import re
 import shutil
+import tempfile
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
-from bs4 import BeautifulSoup
-
 from geo_optimizer.core.schema_validator import validate_jsonld
-from geo_optimizer.models.config import SCHEMA_TEMPLATES
+from geo_optimizer.models.config import HTML_PARSER, SCHEMA_TEMPLATES
 from geo_optimizer.models.results import SchemaAnalysis
 
 ASTRO_TEMPLATE = """\
@@ -89,20 +90,55 @@ const faqSchema = faqItems.length > 0 ? {
 """
 
 
+_PLACEHOLDER_RE = re.compile(r"\{\{(.*?)\}\}")
+
+
+def _fill_node(node, substitute):
+    """Applica la sostituzione ai soli nodi stringa che contengono un segnaposto."""
+    if isinstance(node, str):
+        return _PLACEHOLDER_RE.sub(substitute, node) if "{{" in node else node
+    if isinstance(node, dict):
+        return {_fill_node(k, substitute): _fill_node(v, substitute) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_fill_node(item, substitute) for item in node]
+    return node
+
+
 def fill_template(template: dict, values: dict) -> dict:
     """Sostituisce segnaposto {{key}} nel template con valori sicuri.
 
-    I valori vengono serializzati con json.dumps per evitare
-    JSON injection tramite caratteri speciali (virgolette, backslash).
+    La sostituzione avviene sulle foglie stringa del dict, senza passare
+    per il testo JSON: virgolette e backslash nei valori non possono
+    alterare la struttura dello schema (nessuna JSON injection).
+    Ogni foglia viene scansionata una sola volta con la regex precompilata:
+    un valore che contiene "{{altro}}" non viene espanso una seconda volta.
+    Restituisce una nuova struttura; il template non viene modificato.
     """
-    template_str = json.dumps(template)
-    for key, value in values.items():
-        safe_value = str(value) if value else ""
-        # Escape sicuro: json.dumps aggiunge le virgolette, le rimuoviamo
-        # ma manteniamo l'escape interno (", \, newline, ecc.)
-        escaped = json.dumps(safe_value)[1:-1]
-        template_str = template_str.replace(f"{{{{{key}}}}}", escaped)
-    return json.loads(template_str)
+
+    def _substitute(match: re.Match) -> str:
+        key = match.group(1)
+        if key not in values:
+            return match.group(0)
+        value = values[key]
+        return str(value) if value else ""
+
+    return _fill_node(template, _substitute)
+
+
+try:
+    import orjson
+
+    _ORJSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+    def _dumps_indented(obj) -> str:
+        """Serializza con orjson: stesso output di json.dumps(indent=2, ensure_ascii=False)."""
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode("utf-8")
+
+except ImportError:
+
+    def _dumps_indented(obj) -> str:
+        """Serializza con la libreria standard (orjson non installato)."""
+        return json.dumps(obj, indent=2, ensure_ascii=False)
 
 
 def schema_to_html_tag(schema_dict: dict) -> str:
@@ -111,13 +147,170 @@ def schema_to_html_tag(schema_dict: dict) -> str:
     Esegue escape di '</' per prevenire XSS: il browser chiuderebbe
     prematuramente il tag <script> se incontra '</script>' nel JSON.
     """
-    json_str = json.dumps(schema_dict, indent=2, ensure_ascii=False)
+    json_str = _dumps_indented(schema_dict)
     # Previeni chiusura prematura del tag <script> (XSS)
     json_str = json_str.replace("</", r"<\/")
     return f'<script type="application/ld+json">\n{json_str}\n</script>'
 
 
-def extract_faq_from_html(soup: BeautifulSoup) -> List[Dict[str, str]]:
+# Classi CSS dei contenitori FAQ (percorso BeautifulSoup), compilate una volta
+_FAQ_CLASS_RE = re.compile(r"faq|question|qa", re.I)
+_QUESTION_CLASS_RE = re.compile(r"question", re.I)
+
+
+@lru_cache(maxsize=None)
+def _faq_xpaths() -> Dict[str, object]:
+    """Compila una sola volta le XPath per l'estrazione FAQ da alberi lxml.
+
+    lxml viene importato alla prima chiamata per non rallentare l'avvio della CLI.
+    I filtri sulle classi CSS restano in Python (_FAQ_CLASS_RE): re:test() di
+    EXSLT richiama il motore regex per ogni nodo ed è ~10x più lento. Il
+    contenuto inerte di <template> è escluso, come nel percorso BeautifulSoup.
+    """
+    from lxml import etree
+
+    return {
+        "dt": etree.XPath("descendant-or-self::dt[not(ancestor::template)]"),
+        "details": etree.XPath("descendant-or-self::details[not(ancestor::template)]"),
+        "summary": etree.XPath("(.//summary)[1]"),
+        "with_class": etree.XPath("descendant-or-self::*[@class][not(ancestor::template)]"),
+        "q_heading": etree.XPath("(.//h3 | .//h4 | .//strong)[1]"),
+    }
+
+
+def _next_sibling_dd(dt):
+    """Primo fratello successivo <dd> (equivale a following-sibling::dd[1])."""
+    sibling = dt.getnext()
+    while sibling is not None:
+        if sibling.tag == "dd":
+            return sibling
+        sibling = sibling.getnext()
+    return None
+
+
+def _faq_candidates(soup) -> Tuple[list, list, list]:
+    """Raccoglie <dt>, <details> e contenitori con classe FAQ in una sola visita.
+
+    Equivale a tre find_all() ("dt", "details", class_=_FAQ_CLASS_RE) senza
+    percorrere l'albero tre volte; l'ordine resta quello del documento.
+    """
+    from bs4 import Tag
+
+    dts, details, containers = [], [], []
+    for element in soup.descendants:
+        if not isinstance(element, Tag):
+            continue
+        name = element.name
+        if name == "dt":
+            dts.append(element)
+        elif name == "details":
+            details.append(element)
+        css_class = element.attrs.get("class")
+        if css_class:
+            if not isinstance(css_class, str):
+                css_class = " ".join(css_class)
+            if _FAQ_CLASS_RE.search(css_class):
+                containers.append(element)
+    return dts, details, containers
+
+
+def _first_question_class(container):
+    """Primo discendente con classe che contiene "question" (case-insensitive)."""
+    for element in container.iterdescendants():
+        css_class = element.get("class")
+        if css_class and _QUESTION_CLASS_RE.search(css_class):
+            return element
+    return None
+
+
+# Tag il cui contenuto testuale BeautifulSoup esclude da get_text()
+_TEXTLESS_TAGS = ("script", "style", "template")
+
+
+def _has_text(element) -> bool:
+    """True se il testo dell'elemento conta come per BeautifulSoup (no commenti, script, style, template)."""
+    return isinstance(element.tag, str) and element.tag not in _TEXTLESS_TAGS
+
+
+def _iter_lxml_text(element):
+    """Itera i nodi di testo come BeautifulSoup: esclude commenti, script, style e template.
+
+    Visita iterativa con uno stack esplicito: con huge_tree l'albero può superare
+    la profondità massima di ricorsione di Python.
+    """
+    # Dentro un <template> anche gli elementi annidati non hanno testo per BeautifulSoup
+    if not _has_text(element) or next(element.iterancestors("template"), None) is not None:
+        return
+    if element.text:
+        yield element.text
+    stack = [(iter(element), None)]
+    while stack:
+        children, parent = stack[-1]
+        for child in children:
+            if _has_text(child):
+                if child.text:
+                    yield child.text
+                stack.append((iter(child), child))
+                break
+            if child.tail:
+                yield child.tail
+        else:
+            stack.pop()
+            if parent is not None and parent.tail:
+                yield parent.tail
+
+
+def _lxml_text(element) -> str:
+    """Equivalente lxml di ``Tag.get_text(strip=True)``."""
+    return "".join(text.strip() for text in _iter_lxml_text(element))
+
+
+# Lunghezze minime (dopo strip) perché una coppia venga considerata una FAQ
+_MIN_QUESTION_LEN = 6
+_MIN_ANSWER_LEN = 11
+
+
+def _append_faq(faqs: List[Dict[str, str]], question: str, answer: str) -> None:
+    """Aggiunge la coppia domanda/risposta se supera le soglie minime di lunghezza."""
+    if question and answer and len(question) >= _MIN_QUESTION_LEN and len(answer) >= _MIN_ANSWER_LEN:
+        faqs.append({"question": question, "answer": answer})
+
+
+def _extract_faq_from_lxml(root) -> List[Dict[str, str]]:
+    """Variante di extract_faq_from_html per alberi lxml, con XPath precompilate.
+
+    La radice stessa è inclusa nella ricerca: lxml.html.fromstring() restituisce
+    direttamente l'elemento quando il frammento ne contiene uno solo.
+    """
+    xp = _faq_xpaths()
+    faqs: List[Dict[str, str]] = []
+
+    for dt in xp["dt"](root):
+        dd = _next_sibling_dd(dt)
+        if dd is not None:
+            _append_faq(faqs, _lxml_text(dt), _lxml_text(dd))
+
+    for detail in xp["details"](root):
+        summary = xp["summary"](detail)
+        if summary:
+            question = _lxml_text(summary[0])
+            answer = _lxml_text(detail).replace(question, "", 1).strip()
+            _append_faq(faqs, question, answer)
+
+    for container in xp["with_class"](root):
+        if not _FAQ_CLASS_RE.search(container.get("class")):
+            continue
+        heading = xp["q_heading"](container)
+        q_elem = heading[0] if heading else _first_question_class(container)
+        if q_elem is not None:
+            question = _lxml_text(q_elem)
+            answer = _lxml_text(container).replace(question, "", 1).strip()
+            _append_faq(faqs, question, answer)
+
+    return faqs
+
+
+def extract_faq_from_html(soup) -> List[Dict[str, str]]:
     """
     Auto-extract FAQ items from HTML.
 
@@ -125,58 +318,141 @@ def extract_faq_from_html(soup: BeautifulSoup) -> List[Dict[str, str]]:
     - <dt>question</dt><dd>answer</dd>
     - <details><summary>Q</summary>A</details>
     - <div class="faq-item"><h3>Q</h3><p>A</p></div>
+
+    Accepts a BeautifulSoup tree or an lxml element; the latter is matched
+    with precompiled XPath expressions instead of ``find_all``.
     """
+    from lxml import etree
+
+    if isinstance(soup, etree._Element):
+        return _extract_faq_from_lxml(soup)
+
     faqs = []
+    dts, details, faq_containers = _faq_candidates(soup)
 
     # Pattern 1: <dt> and <dd>
-    for dt in soup.find_all("dt"):
+    for dt in dts:
+        # Prefiltro economico: se il tag ha un solo nodo di testo già sotto soglia,
+        # get_text() (che visita il sottoalbero) non può che restituire un testo più corto
+        if dt.string is not None and len(dt.string) < _MIN_QUESTION_LEN:
+            continue
         dd = dt.find_next_sibling("dd")
         if dd:
-            question = dt.get_text(strip=True)
-            answer = dd.get_text(strip=True)
-            if question and answer and len(question) > 5 and len(answer) > 10:
-                faqs.append({"question": question, "answer": answer})
+            if dd.string is not None and len(dd.string) < _MIN_ANSWER_LEN:
+                continue
+            _append_faq(faqs, dt.get_text(strip=True), dd.get_text(strip=True))
 
     # Pattern 2: <details> / <summary>
     # Nota: NON usiamo .extract() per evitare di mutare il tree del chiamante
-    for detail in soup.find_all("details"):
+    for detail in details:
         summary = detail.find("summary")
         if summary:
             question = summary.get_text(strip=True)
             # Estrai risposta senza mutare il tree: tutto il testo meno la domanda
             full_text = detail.get_text(strip=True)
             answer = full_text.replace(question, "", 1).strip()
-            if question and answer and len(question) > 5 and len(answer) > 10:
-                faqs.append({"question": question, "answer": answer})
+            _append_faq(faqs, question, answer)
 
     # Pattern 3: Common FAQ class patterns
-    faq_containers = soup.find_all(class_=re.compile(r"faq|question|qa", re.I))
     for container in faq_containers:
-        q_elem = container.find(["h3", "h4", "strong"]) or container.find(class_=re.compile(r"question", re.I))
+        q_elem = container.find(["h3", "h4", "strong"]) or container.find(class_=_QUESTION_CLASS_RE)
         if q_elem:
             question = q_elem.get_text(strip=True)
             full_text = container.get_text(strip=True)
             answer = full_text.replace(question, "", 1).strip()
-            if question and answer and len(question) > 5 and len(answer) > 10:
-                faqs.append({"question": question, "answer": answer})
+            _append_faq(faqs, question, answer)
 
     return faqs
 
 
+@lru_cache(maxsize=None)
+def _analysis_xpaths() -> Dict[str, object]:
+    """Compila una sola volta le XPath usate da analyze_html_string."""
+    from lxml import etree
+
+    return {
+        "jsonld": etree.XPath("//script[@type='application/ld+json']"),
+    }
+
+
+# Tag <head> di apertura scritto nel sorgente. lxml crea un <head> implicito
+# quando <title>, <meta> o script compaiono fuori da esso: has_head segue
+# invece il markup, come l'inserimento che rifiuta le pagine senza <head>
+_HEAD_OPEN_RE = re.compile(rb"<head[\s/>]", re.IGNORECASE)
+
+
+def _parse_html_document(raw: bytes):
+    """Costruisce l'albero lxml del documento; None se il markup è vuoto.
+
+    I bytes vengono letti come UTF-8 con encoding esplicito: niente decodifica
+    preventiva in Python, e una dichiarazione <?xml encoding=...?> nel file
+    non blocca il parser. Sequenze non valide diventano U+FFFD.
+
+    huge_tree alza il limite di annidamento di libxml2 (256 livelli); oltre
+    i 2048 livelli viene restituito un albero BeautifulSoup.
+    """
+    from lxml import etree
+    from lxml import html as lxml_html
+
+    try:
+        parser = lxml_html.HTMLParser(encoding="utf-8", huge_tree=True)
+        root = lxml_html.document_fromstring(raw, parser=parser)
+    except etree.ParserError:
+        return None
+
+    # Anche con huge_tree libxml2 si ferma a 2048 livelli e scarta in silenzio il
+    # resto della pagina: in quel caso si ripiega sull'albero BeautifulSoup
+    if any(error.type == etree.ErrorTypes.ERR_RESOURCE_LIMIT for error in parser.error_log):
+        from bs4 import BeautifulSoup
+
+        return BeautifulSoup(raw, HTML_PARSER, from_encoding="utf-8")
+    return root
+
+
 def analyze_html_file(file_path: str) -> SchemaAnalysis:
     """Analyze an HTML file and return found/missing schemas + extracted data."""
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
+    # I bytes passano direttamente a lxml, senza una copia decodificata in memoria
+    with open(file_path, "rb") as f:
+        raw = f.read()
 
-    soup = BeautifulSoup(content, "html.parser")
+    return _analyze_document(_parse_html_document(raw), raw)
+
+
+def analyze_html_string(content: str) -> SchemaAnalysis:
+    """Analizza markup HTML già in memoria (stesso risultato di analyze_html_file)."""
+    raw = content.encode("utf-8")
+    return _analyze_document(_parse_html_document(raw), raw)
+
+
+def _analyze_document(root, raw: bytes) -> SchemaAnalysis:
+    """Analizza l'albero lxml di una pagina (None per un documento vuoto).
+
+    Script JSON-LD e <head> vengono cercati con XPath precompilate, le FAQ
+    con il percorso lxml di extract_faq_from_html. Accetta anche l'albero
+    BeautifulSoup restituito da _parse_html_document per le pagine troppo annidate.
+    """
+    from lxml import etree
+
+    xpaths = _analysis_xpaths()
     found_schemas = []
-    scripts = soup.find_all("script", type="application/ld+json")
+    if root is None:
+        scripts = []
+    elif isinstance(root, etree._Element):
+        scripts = xpaths["jsonld"](root)
+    else:
+        # Albero BeautifulSoup di ripiego (pagine annidate oltre il limite di libxml2)
+        scripts = root.find_all("script", attrs={"type": "application/ld+json"})
+    # Blocchi JSON-LD identici nello stesso file (es. duplicati) vengono parsati una volta
+    parsed_blocks: Dict[str, object] = {}
 
     for idx, script in enumerate(scripts):
         try:
-            script_content = script.string
+            script_content = script.text
             if script_content:
-                data = json.loads(script_content.strip())
+                block = script_content.strip()
+                data = parsed_blocks.get(block)
+                if data is None:
+                    data = parsed_blocks[block] = json.loads(block)
                 if isinstance(data, list):
                     for item in data:
                         schema_type = item.get("@type", "Unknown")
@@ -197,8 +473,8 @@ def analyze_html_file(file_path: str) -> SchemaAnalysis:
         missing.append("faq")
 
     extracted_faqs = []
-    if "FAQPage" not in found_types:
-        extracted_faqs = extract_faq_from_html(soup)
+    if "FAQPage" not in found_types and root is not None:
+        extracted_faqs = extract_faq_from_html(root)
 
     duplicates = {}
     for schema_type in set(found_types):
@@ -212,7 +488,7 @@ def analyze_html_file(file_path: str) -> SchemaAnalysis:
         missing=missing,
         extracted_faqs=extracted_faqs,
         duplicates=duplicates,
-        has_head=bool(soup.find("head")),
+        has_head=root is not None and _HEAD_OPEN_RE.search(raw) is not None,
         total_scripts=len(scripts),
     )
 
@@ -231,6 +507,10 @@ def generate_faq_schema(faq_items: List[Dict[str, str]]) -> dict:
     return schema
 
 
+# Chiusura di <head> per l'inserimento diretto dello schema
+_HEAD_CLOSE_RE = re.compile(rb"</head\s*>", re.IGNORECASE)
+
+
 def inject_schema_into_html(
     file_path: str,
     schema_dict: dict,
@@ -256,28 +536,137 @@ def inject_schema_into_html(
         if not is_valid:
             return False, f"Schema validation failed: {error_msg}"
 
+    with open(file_path, "rb") as f:
+        raw = f.read()
+
+    # Lo schema viene scritto in UTF-8: su un file in un altro encoding lo
+    # splice produrrebbe un file misto. Verifica prima di toccare qualsiasi file.
+    try:
+        content = raw.decode("utf-8")
+    except UnicodeDecodeError as e:
+        return False, f"File is not valid UTF-8 ({e.reason} at byte {e.start}); convert it to UTF-8 first"
+
     if backup:
-        backup_path = f"{file_path}.bak"
-        shutil.copy2(file_path, backup_path)
+        _create_backup(file_path, f"{file_path}.bak")
+
+    # Caso comune: un solo </head> nel file. Il tag viene inserito con uno
+    # splice sui bytes, senza decodificare né costruire l'albero: il resto
+    # del documento resta intatto byte per byte.
+    head_closes = list(_HEAD_CLOSE_RE.finditer(raw))
+    if len(head_closes) == 1:
+        pos = head_closes[0].start()
+        new_raw = raw[:pos] + schema_to_html_tag(schema_dict).encode("utf-8") + raw[pos:]
+    else:
+        # </head> assente (head implicito) o ripetuto (commenti, stringhe
+        # negli script): serve il parser per trovare il vero <head>
+        new_content = _inject_with_soup(content, schema_dict)
+        if new_content is None:
+            return False, "No <head> tag found in HTML"
+        new_raw = new_content.encode("utf-8")
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
+    if backup:
+        # Il backup può condividere l'inode dell'originale: mai riscrivere sul posto
+        _replace_file_content(file_path, new_raw)
+    else:
+        with open(file_path, "wb") as f:
+            f.write(new_raw)
+
+    return True, None
+
+
+def _create_backup(file_path: str, backup_path: str) -> None:
+    """Crea il backup come hardlink (O(1), nessuna copia dei dati).
+
+    Ripiega su shutil.copy2 dove gli hardlink non sono disponibili
+    (filesystem diversi, FAT, alcuni mount di rete).
+    """
+    source = os.path.realpath(file_path)
+    try:
+        if os.path.lexists(backup_path):
+            os.remove(backup_path)
+        os.link(source, backup_path)
+    except OSError:
+        shutil.copy2(source, backup_path)
+
+
+def _replace_file_content(file_path: str, content: bytes) -> None:
+    """Scrive su un file temporaneo e lo sostituisce atomicamente all'originale.
+
+    Il vecchio inode (eventualmente condiviso con il backup) resta intatto;
+    destinazione dei symlink, permessi, flag, xattr/ACL e, quando il processo
+    ne ha i privilegi, proprietario e gruppo vengono copiati sul nuovo file.
+    Essendo un nuovo inode, eventuali altri hardlink alla pagina continuano
+    a puntare alla versione precedente.
+    """
+    target = os.path.realpath(file_path)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".geo-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        # chown prima di copystat: cambiare proprietario azzera i bit setuid/setgid
+        _copy_ownership(target, tmp_path)
+        shutil.copystat(target, tmp_path)
+        # copystat copia anche atime/mtime: la pagina modificata deve risultare nuova
+        os.utime(tmp_path)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _copy_ownership(source: str, dest: str) -> None:
+    """Copia proprietario e gruppo di source su dest, se il processo può farlo."""
+    if not hasattr(os, "chown"):
+        return
+    st = os.stat(source)
+    try:
+        os.chown(dest, st.st_uid, st.st_gid)
+    except OSError:
+        # Senza privilegi si conserva almeno il gruppo, se l'utente vi appartiene
+        try:
+            os.chown(dest, -1, st.st_gid)
+        except OSError:
+            pass
+
+
+def _inject_with_soup(content: str, schema_dict: dict) -> Optional[str]:
+    """Inserisce lo schema in <head> passando da BeautifulSoup; None se manca <head>.
+
+    Usa html.parser e non HTML_PARSER: il file dell'utente viene riscritto, e lxml
+    sintetizzerebbe un <head> mancante o si perderebbe con il frontmatter Astro/MD.
+    """
+    from bs4 import BeautifulSoup
 
     soup = BeautifulSoup(content, "html.parser")
     head = soup.find("head")
     if not head:
-        return False, "No <head> tag found in HTML"
+        return None
 
     schema_tag = soup.new_tag("script", type="application/ld+json")
     # Escape '</' per prevenire XSS da chiusura prematura del tag <script>
-    safe_json = json.dumps(schema_dict, indent=2, ensure_ascii=False).replace("</", r"<\/")
+    safe_json = _dumps_indented(schema_dict).replace("</", r"<\/")
     schema_tag.string = "\n" + safe_json + "\n"
     head.append(schema_tag)
+    return str(soup)
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(str(soup))
 
-    return True, None
+# Caratteri che possono iniettare codice Astro/JS. Per stringhe brevi come
+# url e name, str.replace() in C batte str.translate() con tabella di cancellazione
+_ASTRO_UNSAFE_CHARS = ('"', "'", "`", "\\", "}", "<", ">")
+
+
+def _sanitize_astro_value(val: str) -> str:
+    """Rimuove virgolette, backtick, backslash, parentesi angolari e interpolazioni ``${``.
+
+    ``${`` viene rimosso per ultimo e fino a esaurimento, così non può
+    ricomporsi togliendo i caratteri intermedi (es. ``$<{`` o ``$${{``).
+    """
+    for ch in _ASTRO_UNSAFE_CHARS:
+        val = val.replace(ch, "")
+    while "${" in val:
+        val = val.replace("${", "")
+    return val
 
 
 def generate_astro_snippet(url: str, name: str) -> str:
@@ -287,14 +676,8 @@ def generate_astro_snippet(url: str, name: str) -> str:
     rimuove virgolette e caratteri di controllo che potrebbero
     rompere la struttura del codice generato.
     """
-    # Sanitizza: rimuovi caratteri che possono iniettare codice Astro/JS
-    def _sanitize(val: str) -> str:
-        for ch in ('"', "'", "`", "\\", "${", "}", "<", ">"):
-            val = val.replace(ch, "")
-        return val
-
-    safe_url = _sanitize(url)
-    safe_name = _sanitize(name)
+    safe_url = _sanitize_astro_value(url)
+    safe_name = _sanitize_astro_value(name)
     # Tronca per prevenire abusi
     safe_url = safe_url[:200]
     safe_name = safe_name[:100]
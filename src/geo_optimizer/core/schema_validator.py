@@ -9,6 +9,26 @@ from typing import Dict, List, Optional, Tuple
 
 from geo_optimizer.models.config import SCHEMA_ORG_REQUIRED
 
+# orjson (extra opzionale "fast") decodifica il JSON-LD più velocemente; il suo
+# JSONDecodeError è sottoclasse di json.JSONDecodeError, la gestione errori non cambia
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# Campi obbligatori come frozenset: il caso comune (tutti presenti) è un solo
+# confronto di inclusione sulle chiavi; la lista ordinata serve solo al messaggio
+_REQUIRED_FIELD_SETS = {schema_type: frozenset(fields) for schema_type, fields in SCHEMA_ORG_REQUIRED.items()}
+_DEFAULT_REQUIRED_FIELDS = ("@context", "@type")
+_DEFAULT_REQUIRED_SET = frozenset(_DEFAULT_REQUIRED_FIELDS)
+
+# Valori di @context accettati (tupla: i contesti lista possono contenere oggetti non hashable)
+_VALID_CONTEXTS = ("https://schema.org", "http://schema.org")
+
+# Campi che devono contenere URL e prefissi ammessi, costruiti una sola volta
+_URL_FIELDS = ("url", "sameAs", "logo", "image")
+_URL_PREFIXES = ("http://", "https://", "/")
+
 
 def validate_jsonld(
     schema_dict: Dict,
@@ -33,12 +53,11 @@ def validate_jsonld(
     if not context:
         return False, "Missing required field: @context"
 
-    valid_contexts = ["https://schema.org", "http://schema.org"]
     if isinstance(context, str):
-        if context not in valid_contexts:
+        if context not in _VALID_CONTEXTS:
             return False, f"@context must be 'https://schema.org', got '{context}'"
     elif isinstance(context, list):
-        if not context or context[0] not in valid_contexts:
+        if not context or context[0] not in _VALID_CONTEXTS:
             first = context[0] if context else "empty list"
             return False, f"@context[0] must be 'https://schema.org', got '{first}'"
     else:
@@ -63,13 +82,12 @@ def validate_jsonld(
         if primary_type_normalized != schema_type_normalized:
             return False, f"Expected @type '{schema_type}', got '{primary_type}'"
 
-        required_fields = SCHEMA_ORG_REQUIRED.get(schema_type_normalized, ["@context", "@type"])
-        missing_fields = [f for f in required_fields if f not in schema_dict]
-        if missing_fields:
+        if not schema_dict.keys() >= _REQUIRED_FIELD_SETS.get(schema_type_normalized, _DEFAULT_REQUIRED_SET):
+            required_fields = SCHEMA_ORG_REQUIRED.get(schema_type_normalized, _DEFAULT_REQUIRED_FIELDS)
+            missing_fields = [f for f in required_fields if f not in schema_dict]
             return False, (f"Missing required fields for {primary_type}: {', '.join(missing_fields)}")
 
-    url_fields = ["url", "sameAs", "logo", "image"]
-    for fld in url_fields:
+    for fld in _URL_FIELDS:
         value = schema_dict.get(fld)
         if value:
             if isinstance(value, str):
@@ -80,7 +98,7 @@ def validate_jsonld(
                 continue
 
             for url in urls_to_check:
-                if isinstance(url, str) and not url.startswith(("http://", "https://", "/")):
+                if isinstance(url, str) and not url.startswith(_URL_PREFIXES):
                     if strict:
                         return False, (
                             f"Invalid URL format in '{fld}': '{url}' (must start with http://, https://, or /)"
@@ -96,7 +114,7 @@ def validate_jsonld_string(
 ) -> Tuple[bool, Optional[str]]:
     """Validate a JSON-LD schema from a string."""
     try:
-        schema_dict = json.loads(json_string)
+        schema_dict = _json_loads(json_string)
     except json.JSONDecodeError as e:
         return False, f"Invalid JSON: {e}"
 
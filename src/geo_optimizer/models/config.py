@@ -11,6 +11,12 @@ USER_AGENT = "GEO-Optimizer/2.0 (https://github.com/auriti-labs/geo-optimizer-sk
 
 HEADERS = {"User-Agent": USER_AGENT}
 
+# ─── HTML parsing ────────────────────────────────────────────────────────────
+
+# BeautifulSoup tree builder: lxml is a core dependency and parses far faster
+# than the pure-Python "html.parser"
+HTML_PARSER = "lxml"
+
 # ─── AI bots that should be listed in robots.txt ─────────────────────────────
 
 AI_BOTS = {
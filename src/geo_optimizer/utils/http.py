@@ -9,7 +9,7 @@ Provides robust HTTP session with automatic retry for transient failures:
 """
 
 import requests
-from requests.adapters import HTTPAdapter
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 from urllib3.util.retry import Retry
 
 from geo_optimizer.models.config import HEADERS
@@ -20,6 +20,7 @@ def create_session_with_retry(
     backoff_factor=1.0,
     status_forcelist=None,
     allowed_methods=None,
+    pool_maxsize=DEFAULT_POOLSIZE,
 ):
     """
     Create requests session with exponential backoff retry strategy.
@@ -29,6 +30,8 @@ def create_session_with_retry(
         backoff_factor: Backoff multiplier (default: 1.0)
         status_forcelist: HTTP status codes to retry
         allowed_methods: HTTP methods to retry (default: ["GET", "HEAD"])
+        pool_maxsize: Keep-alive connections kept per host; raise it when
+            the session is shared by a thread pool (default: 10)
 
     Returns:
         requests.Session: Configured session with retry adapter
@@ -49,7 +52,7 @@ def create_session_with_retry(
         raise_on_status=False,
     )
 
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    adapter = HTTPAdapter(max_retries=retry_strategy, pool_maxsize=pool_maxsize)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
 
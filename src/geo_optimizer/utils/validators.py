@@ -7,6 +7,7 @@ prima di effettuare operazioni di rete o filesystem.
 
 import ipaddress
 import socket
+import time
 from pathlib import Path
 from typing import Optional, Set, Tuple
 from urllib.parse import urlparse
@@ -28,6 +29,13 @@ _BLOCKED_NETWORKS = [
     ipaddress.ip_network("fe80::/10"),  # IPv6 link-local
 ]
 
+# Stessa blocklist come coppie (rete, maschera) intere per versione IP:
+# il controllo diventa un AND bit a bit senza passare da IPv4Network.__contains__
+_BLOCKED_RANGES = {
+    version: tuple((int(net.network_address), int(net.netmask)) for net in _BLOCKED_NETWORKS if net.version == version)
+    for version in (4, 6)
+}
+
 _ALLOWED_SCHEMES = {"https", "http"}
 
 # Nomi host interni noti
@@ -39,6 +47,32 @@ _BLOCKED_HOSTNAMES = {
 }
 
 
+# Cache DNS per hostname: una sitemap con centinaia di URL dello stesso host
+# risolve il nome una volta sola invece che a ogni validate_public_url
+_DNS_CACHE_TTL = 60  # secondi
+_DNS_CACHE_MAX_SIZE = 1024
+_dns_cache: dict = {}  # {hostname: (scadenza_monotonic, risultato getaddrinfo)}
+
+
+def _cached_getaddrinfo(hostname: str) -> list:
+    """socket.getaddrinfo() con cache TTL per hostname.
+
+    Gli errori (socket.gaierror) non vengono memorizzati: un host che non
+    risolve viene ritentato alla chiamata successiva.
+    """
+    now = time.monotonic()
+    cached = _dns_cache.get(hostname)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    infos = socket.getaddrinfo(hostname, None)
+    # Limita la memoria: svuota tutto come lo store del rate limiter
+    if len(_dns_cache) >= _DNS_CACHE_MAX_SIZE:
+        _dns_cache.clear()
+    _dns_cache[hostname] = (now + _DNS_CACHE_TTL, infos)
+    return infos
+
+
 def _is_ip_blocked(ip_obj) -> bool:
     """Verifica se un IP è privato/riservato usando le API standard di Python.
 
@@ -66,14 +100,21 @@ def validate_public_url(url: str) -> Tuple[bool, Optional[str]]:
     Returns:
         (True, None) se sicuro, (False, messaggio_errore) altrimenti.
     """
-    parsed = urlparse(url)
+    netloc = _fast_netloc(url)
+    if netloc is not None:
+        # URL http(s) ASCII semplice: stesso risultato di urlparse().hostname
+        # senza il costo di urlparse, che con la cache DNS domina la chiamata
+        scheme = "https" if url.startswith("https://") else "http"
+        hostname = netloc.rpartition("@")[2].partition(":")[0].lower()
+    else:
+        parsed = urlparse(url)
+        scheme, netloc, hostname = parsed.scheme, parsed.netloc, parsed.hostname
 
     # 1. Verifica schema
-    if parsed.scheme not in _ALLOWED_SCHEMES:
-        return False, f"Schema non consentito: '{parsed.scheme}'. Solo http/https."
+    if scheme not in _ALLOWED_SCHEMES:
+        return False, f"Schema non consentito: '{scheme}'. Solo http/https."
 
     # 2. Estrai hostname
-    hostname = parsed.hostname
     if not hostname:
         return False, "Hostname mancante o non valido."
 
@@ -82,27 +123,33 @@ def validate_public_url(url: str) -> Tuple[bool, Optional[str]]:
         return False, f"Host non consentito: '{hostname}'."
 
     # 4. Blocca URL con credenziali embedded (user:pass@host)
-    if "@" in (parsed.netloc or ""):
+    if "@" in (netloc or ""):
         return False, "URL con credenziali embedded non consentiti."
 
     # 5. Risolvi DNS e verifica che ogni IP risolto sia pubblico
     try:
-        infos = socket.getaddrinfo(hostname, None)
+        infos = _cached_getaddrinfo(hostname)
     except socket.gaierror:
         # DNS non risolvibile — non è un errore di sicurezza,
         # lascio che il fetch fallisca normalmente
         return True, None
 
+    # getaddrinfo ripete lo stesso indirizzo per ogni tipo di socket: verifica ciascuno una volta
+    checked = set()
     for _, _, _, _, sockaddr in infos:
         ip_str = sockaddr[0]
+        if ip_str in checked:
+            continue
+        checked.add(ip_str)
         try:
             ip_obj = ipaddress.ip_address(ip_str)
         except ValueError:
             continue
 
         # Controlla blocklist esplicita
-        for network in _BLOCKED_NETWORKS:
-            if ip_obj in network:
+        ip_int = int(ip_obj)
+        for network_int, mask_int in _BLOCKED_RANGES[ip_obj.version]:
+            if ip_int & mask_int == network_int:
                 return False, (
                     f"L'indirizzo '{ip_str}' risolto per '{hostname}' "
                     f"è in una rete privata/riservata."
@@ -156,6 +203,30 @@ def validate_safe_path(
     return True, None
 
 
+def _fast_netloc(url: str) -> Optional[str]:
+    """Estrae il netloc di un URL http(s) ASCII con una sola scansione.
+
+    Restituisce None quando l'URL richiede il parsing completo di urlparse
+    (schema diverso, caratteri non ASCII, tab/newline che urlparse rimuove,
+    host IPv6 tra parentesi quadre).
+    """
+    if not url.isascii() or not url.startswith(("https://", "http://")):
+        return None
+    if "\t" in url or "\r" in url or "\n" in url:
+        return None
+
+    start = url.index("://") + 3
+    end = len(url)
+    for sep in "/?#":
+        pos = url.find(sep, start, end)
+        if pos != -1:
+            end = pos
+    netloc = url[start:end]
+    if "[" in netloc or "]" in netloc:
+        return None
+    return netloc
+
+
 def url_belongs_to_domain(url: str, domain: str) -> bool:
     """
     Verifica l'appartenenza esatta al dominio, senza substring match.
@@ -170,16 +241,21 @@ def url_belongs_to_domain(url: str, domain: str) -> bool:
     Returns:
         True se l'URL appartiene al dominio.
     """
-    parsed = urlparse(url)
-    netloc = parsed.netloc
+    netloc = _fast_netloc(url)
+    if netloc is None:
+        netloc = urlparse(url).netloc
 
     # Blocca URL con credenziali embedded
     if "@" in netloc:
         return False
 
-    # Rimuove porta se presente
-    hostname = netloc.split(":")[0].lower()
+    # Rimuove porta se presente (partition non crea una lista come split)
+    hostname = netloc.partition(":")[0].lower()
     domain_lower = domain.lower()
 
-    # Corrispondenza esatta o subdomain legittimo
-    return hostname == domain_lower or hostname.endswith("." + domain_lower)
+    # Corrispondenza esatta o subdomain legittimo: confronto sugli indici
+    # invece di costruire "." + domain a ogni chiamata
+    if not hostname.endswith(domain_lower):
+        return False
+    cut = len(hostname) - len(domain_lower)
+    return cut == 0 or hostname[cut - 1] == "."
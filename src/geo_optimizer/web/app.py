@@ -14,6 +14,7 @@ import asyncio
 import hashlib
 import logging
 import time
+from collections import OrderedDict, deque
 from typing import Optional
 
 from fastapi import FastAPI, HTTPException, Query, Request
@@ -64,30 +65,37 @@ app.add_middleware(
 )
 
 # ─── Rate Limiter in-memory ───────────────────────────────────────────────────
-_rate_limit_store: dict = {}  # {ip: [timestamp, ...]}
+_rate_limit_store: dict = {}  # {ip: deque([timestamp, ...])}
 _RATE_LIMIT_WINDOW = 60  # secondi
 _RATE_LIMIT_MAX_REQUESTS = 30  # richieste per finestra per IP
+_RATE_LIMIT_MAX_IPS = 10000  # oltre questa soglia lo store viene svuotato
 
 
 def _check_rate_limit(client_ip: str) -> bool:
     """Verifica rate limit per IP. Ritorna True se consentito."""
-    now = time.time()
-    timestamps = _rate_limit_store.get(client_ip, [])
-    # Rimuovi timestamp fuori finestra
-    timestamps = [t for t in timestamps if (now - t) < _RATE_LIMIT_WINDOW]
+    # monotonic: la finestra non salta se l'orologio di sistema viene corretto
+    now = time.monotonic()
+    timestamps = _rate_limit_store.get(client_ip)
+    if timestamps is None:
+        # Pulizia periodica: limita store a _RATE_LIMIT_MAX_IPS IP
+        if len(_rate_limit_store) >= _RATE_LIMIT_MAX_IPS:
+            _rate_limit_store.clear()
+        # Ring buffer per IP: mai più di _RATE_LIMIT_MAX_REQUESTS timestamp
+        timestamps = _rate_limit_store[client_ip] = deque(maxlen=_RATE_LIMIT_MAX_REQUESTS)
+    # Timestamp in ordine crescente: quelli fuori finestra stanno sempre in testa
+    cutoff = now - _RATE_LIMIT_WINDOW
+    while timestamps and timestamps[0] <= cutoff:
+        timestamps.popleft()
     if len(timestamps) >= _RATE_LIMIT_MAX_REQUESTS:
-        _rate_limit_store[client_ip] = timestamps
         return False
     timestamps.append(now)
-    _rate_limit_store[client_ip] = timestamps
-    # Pulizia periodica: limita store a 10000 IP
-    if len(_rate_limit_store) > 10000:
-        _rate_limit_store.clear()
     return True
 
 
-# Cache in-memory per risultati audit (TTL 1 ora, max 500 entry)
-_audit_cache: dict = {}
+# Cache in-memory per risultati audit (TTL 1 ora, max 500 entry).
+# Con TTL fisso l'ordine di inserimento coincide con l'età: scadute e più
+# vecchia stanno sempre in testa e si rimuovono in O(1) con popitem(last=False)
+_audit_cache: OrderedDict = OrderedDict()
 _CACHE_TTL = 3600
 _MAX_CACHE_SIZE = 500
 
@@ -112,20 +120,24 @@ def _get_cached(url: str) -> Optional[dict]:
 def _evict_expired() -> None:
     """Rimuovi entry scadute dalla cache."""
     now = time.time()
-    expired = [k for k, v in _audit_cache.items() if (now - v["cached_at"]) >= _CACHE_TTL]
-    for k in expired:
-        _audit_cache.pop(k, None)
+    # Si ferma alla prima entry valida invece di scorrere tutta la cache
+    while _audit_cache:
+        oldest = next(iter(_audit_cache.values()))
+        if (now - oldest["cached_at"]) < _CACHE_TTL:
+            break
+        _audit_cache.popitem(last=False)
 
 
 def _set_cached(url: str, data: dict) -> str:
     """Salva risultato nella cache con limite dimensione. Ritorna l'ID del report."""
     key = _cache_key(url)
-    # Evita crescita illimitata: evict scadute, poi rimuovi le più vecchie
+    # Una chiave riscritta torna in coda, così l'ordine resta quello per età
+    _audit_cache.pop(key, None)
+    # Evita crescita illimitata: evict scadute, poi rimuovi la più vecchia
     if len(_audit_cache) >= _MAX_CACHE_SIZE:
         _evict_expired()
     if len(_audit_cache) >= _MAX_CACHE_SIZE:
-        oldest_key = min(_audit_cache, key=lambda k: _audit_cache[k]["cached_at"])
-        _audit_cache.pop(oldest_key, None)
+        _audit_cache.popitem(last=False)
     _audit_cache[key] = {"data": data, "cached_at": time.time()}
     return key
 
@@ -0,0 +1,70 @@
+"""Fixture condivise della test suite."""
+
+import ipaddress
+import socket
+from types import MappingProxyType
+
+import pytest
+
+from geo_optimizer.utils import validators
+
+
+class RispostaFinta:
+    """Risposta HTTP minima e immutabile, condivisibile tra test.
+
+    Attributi diretti invece del __getattr__ di Mock: nessuna registrazione
+    delle chiamate e nessun attributo creato al volo. Gli header sono una
+    vista in sola lettura.
+    """
+
+    __slots__ = ("content", "text", "status_code", "headers")
+
+    def __init__(self, content: bytes = b"", text: str = "", status_code: int = 200, headers=None):
+        object.__setattr__(self, "content", content)
+        object.__setattr__(self, "text", text)
+        object.__setattr__(self, "status_code", status_code)
+        object.__setattr__(self, "headers", MappingProxyType(dict(headers or {})))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"RispostaFinta è in sola lettura ({name})")
+
+    def raise_for_status(self):
+        """Nessun errore HTTP simulato: i test di errore usano side_effect."""
+
+
+# Indirizzo pubblico restituito per qualunque hostname durante i test
+_IP_PUBBLICO_FINTO = "93.184.216.34"
+
+
+def _getaddrinfo_senza_rete(host, port, *args, **kwargs):
+    """getaddrinfo deterministico: nessuna query DNS reale.
+
+    Gli IP letterali risolvono a se stessi (come fa getaddrinfo), ogni
+    hostname a un indirizzo pubblico fisso. I test che simulano risoluzioni
+    specifiche continuano a patchare socket.getaddrinfo sopra questo.
+    """
+    try:
+        ip = ipaddress.ip_address(host)
+    except ValueError:
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (_IP_PUBBLICO_FINTO, port or 0))]
+    family = socket.AF_INET6 if ip.version == 6 else socket.AF_INET
+    return [(family, socket.SOCK_STREAM, 6, "", (str(ip), port or 0))]
+
+
+@pytest.fixture(autouse=True)
+def _dns_senza_rete(monkeypatch):
+    """Nessun test dipende dalla rete o dalla latenza del resolver."""
+    monkeypatch.setattr(socket, "getaddrinfo", _getaddrinfo_senza_rete)
+
+
+@pytest.fixture(autouse=True)
+def _svuota_cache_dns():
+    """Ogni test parte con la cache DNS dei validatori vuota.
+
+    I test simulano risoluzioni diverse per lo stesso hostname patchando
+    socket.getaddrinfo: un risultato memorizzato da un test precedente
+    nasconderebbe il mock.
+    """
+    validators._dns_cache.clear()
+    yield
+    validators._dns_cache.clear()
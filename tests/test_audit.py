@@ -269,7 +269,7 @@ def test_schema_detection():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_schema(soup, "https://example.com")
 
     assert result["has_website"] is True
@@ -291,7 +291,7 @@ def test_schema_detection_no_schema():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_schema(soup, "https://example.com")
 
     assert result["has_website"] is False
@@ -320,7 +320,7 @@ def test_schema_detection_multiple_types():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_schema(soup, "https://example.com")
 
     assert result["has_website"] is True
@@ -353,7 +353,7 @@ def test_meta_tags_validation():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_meta_tags(soup, "https://example.com")
 
     assert result["has_title"] is True
@@ -376,7 +376,7 @@ def test_meta_tags_missing():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_meta_tags(soup, "https://example.com")
 
     assert result["has_title"] is False
@@ -408,7 +408,7 @@ def test_external_citations_count():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_content_quality(soup, "https://example.com")
 
     assert result["has_links"] is True
@@ -435,7 +435,7 @@ def test_content_quality_numbers():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_content_quality(soup, "https://example.com")
 
     assert result["has_h1"] is True
@@ -615,7 +615,7 @@ def test_schema_invalid_json():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_schema(soup, "https://example.com")
 
     # Should handle gracefully without crashing
@@ -767,7 +767,7 @@ def test_html_charset_mismatch():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_meta_tags(soup, "https://example.com")
 
     assert result["has_title"] is True
@@ -785,7 +785,7 @@ def test_meta_charset_missing():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_meta_tags(soup, "https://example.com")
 
     assert result["has_title"] is True
@@ -816,7 +816,7 @@ def test_schema_malformed_json():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_schema(soup, "https://example.com")
 
     # Should handle gracefully without crashing
@@ -841,7 +841,7 @@ def test_schema_missing_required_fields():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_schema(soup, "https://example.com")
 
     # Should detect schema but mark as invalid/unknown type
@@ -868,7 +868,7 @@ def test_schema_invalid_url_format():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_schema(soup, "https://example.com")
 
     # Should still detect WebSite type even with invalid URL
@@ -914,7 +914,7 @@ def test_page_without_title():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_meta_tags(soup, "https://example.com")
 
     assert result["has_title"] is False
@@ -1133,7 +1133,7 @@ def test_schema_array_of_schemas():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_schema(soup, "https://example.com")
 
     assert result["has_website"] is True
@@ -1164,7 +1164,7 @@ def test_schema_nested_types():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_schema(soup, "https://example.com")
 
     assert result["has_website"] is True
@@ -1183,7 +1183,7 @@ def test_meta_tags_long_title():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_meta_tags(soup, "https://example.com")
 
     assert result["has_title"] is True
@@ -1202,7 +1202,7 @@ def test_meta_tags_short_description():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_meta_tags(soup, "https://example.com")
 
     assert result["has_description"] is True
@@ -1221,7 +1221,7 @@ def test_meta_tags_long_description():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_meta_tags(soup, "https://example.com")
 
     assert result["has_description"] is True
@@ -1240,7 +1240,7 @@ def test_content_quality_few_headings():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_content_quality(soup, "https://example.com")
 
     assert result["has_h1"] is True
@@ -1264,7 +1264,7 @@ def test_content_quality_good_heading_structure():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_content_quality(soup, "https://example.com")
 
     assert result["has_h1"] is True
@@ -1286,7 +1286,7 @@ def test_content_quality_sufficient_word_count():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_content_quality(soup, "https://example.com")
 
     assert result["word_count"] >= 300
@@ -1305,7 +1305,7 @@ def test_content_quality_low_word_count():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_content_quality(soup, "https://example.com")
 
     assert result["word_count"] < 300
@@ -1324,7 +1324,7 @@ def test_content_quality_few_numbers():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_content_quality(soup, "https://example.com")
 
     assert result["has_numbers"] is False
@@ -1344,7 +1344,7 @@ def test_content_quality_no_external_links():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_content_quality(soup, "https://example.com")
 
     assert result["has_links"] is False
@@ -1363,7 +1363,7 @@ def test_content_quality_missing_h1():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_content_quality(soup, "https://example.com")
 
     assert result["has_h1"] is False
@@ -1493,7 +1493,7 @@ def test_schema_empty_type():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_schema(soup, "https://example.com")
 
     assert result["has_website"] is False
@@ -1515,7 +1515,7 @@ def test_content_quality_with_currency():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_content_quality(soup, "https://example.com")
 
     assert result["has_numbers"] is True
@@ -1534,7 +1534,7 @@ def test_meta_tags_empty_content():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_meta_tags(soup, "https://example.com")
 
     assert result["has_title"] is False
@@ -1554,7 +1554,7 @@ def test_meta_tags_whitespace_only():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_meta_tags(soup, "https://example.com")
 
     assert result["has_title"] is False
@@ -1574,7 +1574,7 @@ def test_meta_tags_optimal_description_length():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_meta_tags(soup, "https://example.com")
 
     assert result["has_description"] is True
@@ -1607,7 +1607,7 @@ def test_schema_multiple_same_type():
 
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     result = audit_schema(soup, "https://example.com")
 
     assert result["has_website"] is True
@@ -1668,7 +1668,7 @@ Allow: /
 
         from bs4 import BeautifulSoup
 
-        soup = BeautifulSoup(html_content, "html.parser")
+        soup = BeautifulSoup(html_content, "lxml")
         schema = audit_schema(soup, "https://example.com")
         meta = audit_meta_tags(soup, "https://example.com")
         content = audit_content_quality(soup, "https://example.com")
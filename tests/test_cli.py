@@ -383,6 +383,7 @@ class TestLlmsCommand:
         mock_fetch.assert_called_once_with(
             "https://example.com/sitemap.xml",
             on_status=mock_fetch.call_args[1]["on_status"],
+            session=mock_discover.call_args[1]["session"],
         )
         mock_generate.assert_called_once()
 
@@ -16,10 +16,12 @@ All HTTP calls are mocked — no network access.
 Author: Juan Camilo Auriti
 """
 
+import json
 import os
 import tempfile
 from unittest.mock import MagicMock, Mock, patch
 
+import pytest
 from bs4 import BeautifulSoup
 
 # ─── Core imports ────────────────────────────────────────────────────────────
@@ -35,6 +37,8 @@ from geo_optimizer.core.audit import (
     run_full_audit,
 )
 from geo_optimizer.core.llms_generator import (
+    _resolve_loc,
+    _url_path,
     categorize_url,
     discover_sitemap,
     fetch_page_title,
@@ -44,7 +48,10 @@ from geo_optimizer.core.llms_generator import (
     url_to_label,
 )
 from geo_optimizer.core.schema_injector import (
+    _FAQ_CLASS_RE,
+    _faq_candidates,
     analyze_html_file,
+    analyze_html_string,
     extract_faq_from_html,
     fill_template,
     generate_astro_snippet,
@@ -841,7 +848,7 @@ class TestAuditSchema:
         html = '''<html><head><script type="application/ld+json">
         {"@context":"https://schema.org","@type":"WebSite","name":"Test","url":"https://example.com"}
         </script></head><body></body></html>'''
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_schema(soup, "https://example.com")
         assert "WebSite" in result.found_types
         assert result.has_website is True
@@ -850,7 +857,7 @@ class TestAuditSchema:
         html = '''<html><head><script type="application/ld+json">
         {"@context":"https://schema.org","@type":"FAQPage","mainEntity":[]}
         </script></head><body></body></html>'''
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_schema(soup, "https://example.com")
         assert result.has_faq is True
 
@@ -858,13 +865,13 @@ class TestAuditSchema:
         html = '''<html><head><script type="application/ld+json">
         {"@context":"https://schema.org","@type":"WebApplication","name":"App","url":"https://example.com"}
         </script></head><body></body></html>'''
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_schema(soup, "https://example.com")
         assert result.has_webapp is True
 
     def test_no_schema(self):
         html = "<html><head></head><body></body></html>"
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_schema(soup, "https://example.com")
         assert result.found_types == []
         assert result.has_website is False
@@ -879,7 +886,7 @@ class TestAuditSchema:
             f'<script type="application/ld+json">{faq}</script>'
             f'</head><body></body></html>'
         )
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_schema(soup, "https://example.com")
         assert result.has_website is True
         assert result.has_faq is True
@@ -889,7 +896,7 @@ class TestAuditSchema:
         html = '''<html><head><script type="application/ld+json">
         {not valid json}
         </script></head><body></body></html>'''
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_schema(soup, "https://example.com")
         assert result.found_types == []
 
@@ -897,7 +904,7 @@ class TestAuditSchema:
         html = '''<html><head><script type="application/ld+json">
         {"@context":"https://schema.org","@type":["WebSite","SearchAction"],"name":"T","url":"https://example.com"}
         </script></head><body></body></html>'''
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_schema(soup, "https://example.com")
         assert "WebSite" in result.found_types
         assert result.has_website is True
@@ -908,7 +915,7 @@ class TestAuditSchema:
         [{"@context":"https://schema.org","@type":"WebSite","name":"T","url":"https://example.com"},
          {"@context":"https://schema.org","@type":"FAQPage","mainEntity":[]}]
         </script></head><body></body></html>'''
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_schema(soup, "https://example.com")
         assert result.has_website is True
         assert result.has_faq is True
@@ -926,7 +933,7 @@ class TestAuditMetaTags:
         <meta property="og:description" content="Description">
         <meta property="og:image" content="https://example.com/image.jpg">
         </head><body></body></html>'''
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_meta_tags(soup, "https://example.com")
         assert result.has_title is True
         assert result.title_text == "My Site"
@@ -939,7 +946,7 @@ class TestAuditMetaTags:
 
     def test_no_meta_tags(self):
         html = "<html><head></head><body></body></html>"
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_meta_tags(soup, "https://example.com")
         assert result.has_title is False
         assert result.has_description is False
@@ -947,13 +954,13 @@ class TestAuditMetaTags:
 
     def test_empty_title(self):
         html = "<html><head><title>  </title></head><body></body></html>"
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_meta_tags(soup, "https://example.com")
         assert result.has_title is False
 
     def test_empty_description(self):
         html = '<html><head><meta name="description" content=""></head><body></body></html>'
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_meta_tags(soup, "https://example.com")
         assert result.has_description is False
 
@@ -962,7 +969,7 @@ class TestAuditMetaTags:
         <title>Test Title</title>
         <meta name="description" content="This is the description">
         </head><body></body></html>'''
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_meta_tags(soup, "https://example.com")
         assert result.title_length == len("Test Title")
         assert result.description_length == len("This is the description")
@@ -978,7 +985,7 @@ class TestAuditContentQuality:
         <p>There are 1000 users and 50% growth rate. Revenue: $2000000.</p>
         <a href="https://external.com/source">External link</a>
         </body></html>'''
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_content_quality(soup, "https://example.com")
         assert result.has_h1 is True
         assert result.h1_text == "Main Title"
@@ -989,7 +996,7 @@ class TestAuditContentQuality:
 
     def test_empty_content(self):
         html = "<html><body></body></html>"
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_content_quality(soup, "https://example.com")
         assert result.has_h1 is False
         assert result.heading_count == 0
@@ -1000,7 +1007,7 @@ class TestAuditContentQuality:
         html = '''<html><body>
         <a href="https://example.com/internal">Internal</a>
         </body></html>'''
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_content_quality(soup, "https://example.com")
         assert result.has_links is False
         assert result.external_links_count == 0
@@ -1008,7 +1015,7 @@ class TestAuditContentQuality:
     def test_few_numbers_not_enough(self):
         """Need at least 3 numbers to flag has_numbers."""
         html = "<html><body><p>There are 50% and 100 items.</p></body></html>"
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_content_quality(soup, "https://example.com")
         assert result.numbers_count == 2
         assert result.has_numbers is False
@@ -1309,6 +1316,11 @@ class TestCategorizeUrl:
         cat = categorize_url("https://example.com/privacy-policy", "example.com")
         assert cat == "Privacy & Legal"
 
+    def test_pattern_order_beats_match_position(self):
+        """The first CATEGORY_PATTERNS entry wins, not the leftmost match in the path."""
+        cat = categorize_url("https://example.com/tools/blog/best-tools", "example.com")
+        assert cat == "Blog & Articles"
+
 
 class TestUrlToLabel:
     """Tests for url_to_label()."""
@@ -1333,6 +1345,27 @@ class TestUrlToLabel:
         label = url_to_label("https://example.com", "example.com")
         assert label == "Homepage"
 
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "https://example.com/blog/post?ref=x#top",
+            "https://example.com?q=/not/a/path",
+            "https://example.com#/frag",
+            "https://user@example.com:8080/a/b/",
+            "https://example.com/a;params/b;x",
+            "https://[::1]/ipv6",
+            "HTTPS://example.com/Upper",
+            "https://example.com/caf\u00e9",
+            "https://example.com/a\tb",
+            "ftp://example.com/file",
+        ],
+    )
+    def test_url_path_matches_urlparse(self, url):
+        """The fast path helper agrees with urlparse(url).path."""
+        from urllib.parse import urlparse
+
+        assert _url_path(url) == urlparse(url).path
+
 
 class TestFetchPageTitle:
     """Tests for fetch_page_title()."""
@@ -1357,6 +1390,17 @@ class TestFetchPageTitle:
         title = fetch_page_title("https://example.com/page")
         assert title == "Heading Title"
 
+    @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
+    def test_fetch_title_h1_keeps_nested_text(self, mock_create):
+        """Only <title>/<h1> are built, but nested markup inside <h1> is kept."""
+        body = "<div><p>filler</p></div>" * 50
+        html = f"<html><body>{body}<h1><span>Deep</span> Heading</h1><h1>Second</h1></body></html>"
+        mock_session = MagicMock()
+        mock_session.get.return_value = Mock(status_code=200, text=html)
+        mock_create.return_value = mock_session
+
+        assert fetch_page_title("https://example.com/page") == "Deep Heading"
+
     @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
     def test_fetch_title_error(self, mock_create):
         mock_session = MagicMock()
@@ -1425,6 +1469,59 @@ class TestFetchSitemap:
         assert len(urls) == 1
         assert urls[0].url == "https://example.com/page1"
 
+    @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
+    def test_sitemap_index_keeps_sub_sitemap_order(self, mock_create):
+        """Sub-sitemaps are fetched concurrently but merged in index order."""
+        shards = [f"https://example.com/sitemap-{i}.xml" for i in range(5)]
+        index_xml = (
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            + "".join(f"<sitemap><loc>{s}</loc></sitemap>" for s in shards)
+            + "</sitemapindex>"
+        )
+
+        def fake_get(url, **kwargs):
+            if url == "https://example.com/sitemap.xml":
+                body = index_xml
+            else:
+                n = url.rsplit("-", 1)[1].split(".")[0]
+                body = (
+                    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                    f"<url><loc>https://example.com/shard{n}/a</loc></url>"
+                    f"<url><loc>https://example.com/shard{n}/b</loc></url>"
+                    "</urlset>"
+                )
+            return Mock(content=body.encode(), raise_for_status=Mock())
+
+        mock_session = MagicMock()
+        mock_session.get.side_effect = fake_get
+        mock_create.return_value = mock_session
+
+        urls = fetch_sitemap("https://example.com/sitemap.xml")
+        assert [u.url for u in urls] == [f"https://example.com/shard{i}/{p}" for i in range(5) for p in "ab"]
+        assert mock_session.get.call_count == 6
+
+    @pytest.mark.parametrize(
+        "loc",
+        [
+            "https://example.com/a/b",
+            "https://example.com/a/../b",
+            "https://example.com/page?",
+            "https://example.com/page#",
+            "https://example.com/a;p",
+            "https:///no-host",
+            "/relative/page",
+            "page.html",
+            "HTTPS://Example.com/x",
+            "https://example.com/caf\u00e9",
+        ],
+    )
+    def test_resolve_loc_matches_urljoin(self, loc):
+        """The absolute-<loc> shortcut returns exactly what urljoin would."""
+        from urllib.parse import urljoin
+
+        base = "https://example.com/sitemaps/sitemap.xml"
+        assert _resolve_loc(base, loc) == urljoin(base, loc)
+
     @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
     def test_sitemap_fetch_error(self, mock_create):
         mock_session = MagicMock()
@@ -1452,6 +1549,77 @@ class TestFetchSitemap:
         assert len(urls) == 1
         assert any("Fetching" in m for m in status_msgs)
 
+    @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
+    def test_sitemap_image_extension_loc_ignored(self, mock_create):
+        """<image:loc> must not be taken for the page <loc>, even when it comes first."""
+        xml = '''<?xml version="1.0" encoding="UTF-8"?>
+        <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+                xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+          <url>
+            <image:image><image:loc>https://cdn.example.com/hero.png</image:loc></image:image>
+            <loc>https://example.com/gallery</loc>
+          </url>
+          <url><image:image><image:loc>https://cdn.example.com/orphan.png</image:loc></image:image></url>
+        </urlset>'''
+        mock_session = MagicMock()
+        mock_resp = Mock()
+        mock_resp.content = xml.encode()
+        mock_resp.raise_for_status = Mock()
+        mock_session.get.return_value = mock_resp
+        mock_create.return_value = mock_session
+
+        urls = fetch_sitemap("https://example.com/sitemap.xml")
+        assert [u.url for u in urls] == ["https://example.com/gallery"]
+
+    @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
+    def test_sitemap_prefixed_namespace(self, mock_create):
+        """A sitemap that binds the sitemaps.org namespace to a prefix is still read."""
+        xml = b'''<?xml version="1.0" encoding="UTF-8"?>
+        <sm:urlset xmlns:sm="http://www.sitemaps.org/schemas/sitemap/0.9"
+                   xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+          <sm:url>
+            <image:image><image:loc>https://cdn.example.com/hero.png</image:loc></image:image>
+            <sm:loc>https://example.com/a</sm:loc><sm:priority>0.8</sm:priority>
+          </sm:url>
+          <sm:url><sm:loc>https://example.com/b</sm:loc></sm:url>
+        </sm:urlset>'''
+        mock_session = MagicMock()
+        mock_session.get.return_value = Mock(content=xml, raise_for_status=Mock())
+        mock_create.return_value = mock_session
+
+        urls = fetch_sitemap("https://example.com/sitemap.xml")
+        assert [u.url for u in urls] == ["https://example.com/a", "https://example.com/b"]
+        assert urls[0].priority == 0.8
+
+    @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
+    def test_sitemap_not_xml_returns_empty(self, mock_create):
+        mock_session = MagicMock()
+        mock_resp = Mock()
+        mock_resp.content = b""
+        mock_resp.raise_for_status = Mock()
+        mock_session.get.return_value = mock_resp
+        mock_create.return_value = mock_session
+
+        assert fetch_sitemap("https://example.com/sitemap.xml") == []
+
+    @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
+    def test_sitemap_truncated_keeps_parsed_urls(self, mock_create):
+        """A sitemap cut off mid-download still yields the entries read so far."""
+        xml = b'''<?xml version="1.0" encoding="UTF-8"?>
+        <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+                xmlns:xhtml="http://www.w3.org/1999/xhtml">
+          <url><loc>https://example.com/a</loc><xhtml:url>https://example.com/it/a</xhtml:url></url>
+          <url><loc>https://example.com/b</loc><lastmod>2024-'''
+        mock_session = MagicMock()
+        mock_resp = Mock()
+        mock_resp.content = xml
+        mock_resp.raise_for_status = Mock()
+        mock_session.get.return_value = mock_resp
+        mock_create.return_value = mock_session
+
+        urls = fetch_sitemap("https://example.com/sitemap.xml")
+        assert [u.url for u in urls] == ["https://example.com/a", "https://example.com/b"]
+
 
 class TestGenerateLlmsTxt:
     """Tests for generate_llms_txt()."""
@@ -1560,6 +1728,58 @@ class TestDiscoverSitemap:
         url = discover_sitemap("https://example.com")
         assert url is None
 
+    @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
+    def test_discover_common_paths_keeps_priority_order(self, mock_create):
+        """Concurrent HEAD probes: a faster low-priority hit must not win."""
+        import time
+
+        def fake_head(url, **kwargs):
+            if url.endswith("/sitemap_index.xml"):
+                time.sleep(0.05)
+                return Mock(status_code=200)
+            if url.endswith("/wp-sitemap.xml"):
+                return Mock(status_code=200)
+            return Mock(status_code=404)
+
+        mock_session = MagicMock()
+        mock_session.get.return_value = Mock(text="User-agent: *\nDisallow:\n")
+        mock_session.head.side_effect = fake_head
+        mock_create.return_value = mock_session
+
+        url = discover_sitemap("https://example.com")
+        assert url == "https://example.com/sitemap_index.xml"
+
+    @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
+    def test_discover_primary_path_hit_sends_one_head(self, mock_create):
+        """When /sitemap.xml answers 200 the fallback paths are never probed."""
+        mock_session = MagicMock()
+        mock_session.get.return_value = Mock(text="User-agent: *\nDisallow:\n")
+        mock_session.head.return_value = Mock(status_code=200)
+        mock_create.return_value = mock_session
+
+        url = discover_sitemap("https://example.com")
+
+        assert url == "https://example.com/sitemap.xml"
+        assert mock_session.head.call_count == 1
+        mock_create.assert_called_once()
+
+    @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
+    def test_discover_fallback_probes_skip_retries(self, mock_create):
+        """Fallback paths are probed on a no-retry session with a short timeout."""
+        main_session = MagicMock()
+        main_session.get.return_value = Mock(text="User-agent: *\nDisallow:\n")
+        main_session.head.return_value = Mock(status_code=404)
+        fallback_session = MagicMock()
+        fallback_session.head.return_value = Mock(status_code=404)
+        mock_create.side_effect = [main_session, fallback_session]
+
+        assert discover_sitemap("https://example.com") is None
+
+        assert main_session.head.call_count == 1
+        assert fallback_session.head.call_count == 5
+        assert mock_create.call_args_list[1][1]["total_retries"] == 0
+        assert {c[1]["timeout"] for c in fallback_session.head.call_args_list} == {3}
+
     @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
     def test_discover_with_on_status_callback(self, mock_create):
         mock_session = MagicMock()
@@ -1608,6 +1828,13 @@ class TestFillTemplate:
         result = fill_template(template, {"name": "Test"})
         assert result["title"] == "Test - Test"
 
+    def test_placeholders_inside_lists_and_non_string_leaves(self):
+        template = {"items": [{"position": 1, "item": "{{url}}"}], "active": True}
+        result = fill_template(template, {"url": "https://example.com"})
+        assert result == {"items": [{"position": 1, "item": "https://example.com"}], "active": True}
+        # The template itself is left untouched
+        assert template["items"][0]["item"] == "{{url}}"
+
 
 class TestSchemaToHtmlTag:
     """Tests for schema_to_html_tag()."""
@@ -1624,56 +1851,115 @@ class TestSchemaToHtmlTag:
         tag = schema_to_html_tag(schema)
         assert "\u00e9" in tag
 
+    def test_body_matches_stdlib_indent(self):
+        # Same layout whether or not the optional orjson backend is installed
+        schema = {"@type": "FAQPage", "mainEntity": [{"name": "Caf\u00e9?", "n": 1}], "empty": {}}
+        tag = schema_to_html_tag(schema)
+        body = tag.split("\n", 1)[1].rsplit("\n", 1)[0]
+        assert body == json.dumps(schema, indent=2, ensure_ascii=False)
+
+
+# Static FAQ snippets, parsed once per module by the ``faq_soups`` fixture
+FAQ_HTML = {
+    "dt_dd": "<dl><dt>What is GEO?</dt><dd>Generative Engine Optimization helps sites</dd></dl>",
+    "details_summary": (
+        "<details><summary>What is SEO optimization?</summary>"
+        "SEO is the process of improving your site visibility</details>"
+    ),
+    "faq_class": (
+        '<div class="faq-item"><h3>How do I start with GEO?</h3>'
+        '<p>Start by running the audit tool on your website</p></div>'
+    ),
+    "no_faqs": "<p>Just a paragraph with no FAQs at all.</p>",
+    "short_question": "<dl><dt>Hi?</dt><dd>This is a really long answer that should be enough.</dd></dl>",
+    "short_answer": "<dl><dt>What is this thing?</dt><dd>Short.</dd></dl>",
+}
+
+
+@pytest.fixture(scope="module")
+def faq_soups():
+    """FAQ_HTML parsed once; extract_faq_from_html never mutates the tree."""
+    return {name: BeautifulSoup(html, "lxml") for name, html in FAQ_HTML.items()}
+
 
 class TestExtractFaqFromHtml:
     """Tests for extract_faq_from_html()."""
 
-    def test_dt_dd_pattern(self):
-        html = "<dl><dt>What is GEO?</dt><dd>Generative Engine Optimization helps sites</dd></dl>"
-        soup = BeautifulSoup(html, "html.parser")
-        faqs = extract_faq_from_html(soup)
+    def test_dt_dd_pattern(self, faq_soups):
+        faqs = extract_faq_from_html(faq_soups["dt_dd"])
         assert len(faqs) == 1
         assert faqs[0]["question"] == "What is GEO?"
 
-    def test_details_summary_pattern(self):
-        html = (
-            "<details><summary>What is SEO optimization?</summary>"
-            "SEO is the process of improving your site visibility</details>"
-        )
-        soup = BeautifulSoup(html, "html.parser")
-        faqs = extract_faq_from_html(soup)
+    def test_details_summary_pattern(self, faq_soups):
+        faqs = extract_faq_from_html(faq_soups["details_summary"])
         assert len(faqs) == 1
         assert "SEO" in faqs[0]["question"]
 
-    def test_faq_class_pattern(self):
-        html = (
-            '<div class="faq-item"><h3>How do I start with GEO?</h3>'
-            '<p>Start by running the audit tool on your website</p></div>'
-        )
-        soup = BeautifulSoup(html, "html.parser")
-        faqs = extract_faq_from_html(soup)
+    def test_faq_class_pattern(self, faq_soups):
+        faqs = extract_faq_from_html(faq_soups["faq_class"])
         assert len(faqs) == 1
 
-    def test_no_faqs_found(self):
-        html = "<p>Just a paragraph with no FAQs at all.</p>"
-        soup = BeautifulSoup(html, "html.parser")
-        faqs = extract_faq_from_html(soup)
+    def test_no_faqs_found(self, faq_soups):
+        faqs = extract_faq_from_html(faq_soups["no_faqs"])
         assert faqs == []
 
-    def test_short_question_skipped(self):
+    def test_short_question_skipped(self, faq_soups):
         """Questions shorter than 6 chars are skipped."""
-        html = "<dl><dt>Hi?</dt><dd>This is a really long answer that should be enough.</dd></dl>"
-        soup = BeautifulSoup(html, "html.parser")
-        faqs = extract_faq_from_html(soup)
+        faqs = extract_faq_from_html(faq_soups["short_question"])
         assert faqs == []
 
-    def test_short_answer_skipped(self):
+    def test_short_answer_skipped(self, faq_soups):
         """Answers shorter than 11 chars are skipped."""
-        html = "<dl><dt>What is this thing?</dt><dd>Short.</dd></dl>"
-        soup = BeautifulSoup(html, "html.parser")
-        faqs = extract_faq_from_html(soup)
+        faqs = extract_faq_from_html(faq_soups["short_answer"])
         assert faqs == []
 
+    @pytest.mark.parametrize("name", sorted(FAQ_HTML))
+    def test_lxml_tree_matches_soup(self, faq_soups, name):
+        """An lxml tree yields the same FAQs as the BeautifulSoup tree."""
+        import lxml.html
+
+        tree = lxml.html.fromstring(FAQ_HTML[name])
+        assert extract_faq_from_html(tree) == extract_faq_from_html(faq_soups[name])
+
+    def test_template_content_ignored(self):
+        """FAQs inside an inert <template> are skipped by both the soup and the lxml path."""
+        import lxml.html
+
+        html = (
+            "<html><body><template><dl><dt>Hidden question?</dt><dd>Hidden answer text here.</dd></dl>"
+            '<div class="faq"><h3>Hidden faq class?</h3><p>Hidden class answer</p></div></template>'
+            "<dl><dt>Visible question?</dt><dd>Visible answer text here.<template>x</template></dd></dl>"
+            "</body></html>"
+        )
+        expected = [{"question": "Visible question?", "answer": "Visible answer text here."}]
+        assert extract_faq_from_html(BeautifulSoup(html, "lxml")) == expected
+        assert extract_faq_from_html(lxml.html.document_fromstring(html)) == expected
+
+    def test_candidates_match_find_all(self):
+        """The single tree walk finds the same elements, in order, as three find_all() calls."""
+        soup = BeautifulSoup(
+            '<div class="card QA-block"><dl><dt>Nested question here?</dt><dd>x</dd></dl>'
+            '<details class="faq"><summary>Q</summary></details></div>'
+            '<p class="question">loose</p><dt>Second definition term</dt>',
+            "lxml",
+        )
+        expected = (
+            soup.find_all("dt"),
+            soup.find_all("details"),
+            soup.find_all(class_=_FAQ_CLASS_RE),
+        )
+        assert _faq_candidates(soup) == expected
+
+    def test_lxml_tree_skips_script_text(self):
+        html = (
+            "<details><summary>How is text extracted?</summary>"
+            "<script>var x = 1;</script>Script and style content is ignored</details>"
+        )
+        import lxml.html
+
+        faqs = extract_faq_from_html(lxml.html.fromstring(html))
+        assert faqs[0]["answer"] == "Script and style content is ignored"
+
 
 class TestGenerateFaqSchema:
     """Tests for generate_faq_schema()."""
@@ -1695,101 +1981,165 @@ class TestGenerateFaqSchema:
         assert schema["mainEntity"] == []
 
 
-class TestAnalyzeHtmlFile:
-    """Tests for analyze_html_file()."""
+_WS1 = '{"@context":"https://schema.org","@type":"WebSite","name":"T","url":"https://example.com"}'
+_WS2 = '{"@context":"https://schema.org","@type":"WebSite","name":"T2","url":"https://example.com"}'
 
-    def test_analyze_file_with_schemas(self):
-        html = '''<html><head>
+# Static pages for analyze_html_file, written to disk once per module
+ANALYZE_HTML = {
+    "with_schemas": '''<html><head>
         <script type="application/ld+json">
         {"@context":"https://schema.org","@type":"WebSite","name":"Test","url":"https://example.com"}
         </script>
-        </head><body></body></html>'''
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".html", delete=False) as f:
-            f.write(html)
-            f.flush()
-            path = f.name
-
-        try:
-            analysis = analyze_html_file(path)
-            assert "WebSite" in analysis.found_types
-            assert analysis.has_head is True
-            assert analysis.total_scripts == 1
-            assert "webapp" in analysis.missing
-            assert "faq" in analysis.missing
-        finally:
-            os.unlink(path)
-
-    def test_analyze_file_no_schemas(self):
-        html = "<html><head></head><body><p>No schemas here</p></body></html>"
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".html", delete=False) as f:
-            f.write(html)
-            f.flush()
-            path = f.name
-
-        try:
-            analysis = analyze_html_file(path)
-            assert analysis.found_types == []
-            assert "website" in analysis.missing
-            assert analysis.total_scripts == 0
-        finally:
-            os.unlink(path)
-
-    def test_analyze_file_with_faqs(self):
-        html = '''<html><head></head><body>
+        </head><body></body></html>''',
+    "no_schemas": "<html><head></head><body><p>No schemas here</p></body></html>",
+    "with_faqs": '''<html><head></head><body>
         <dl>
         <dt>What is GEO optimization?</dt>
         <dd>GEO is Generative Engine Optimization for AI visibility</dd>
         </dl>
-        </body></html>'''
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".html", delete=False) as f:
-            f.write(html)
-            f.flush()
-            path = f.name
+        </body></html>''',
+    "duplicate_schemas": (
+        f'<html><head>'
+        f'<script type="application/ld+json">{_WS1}</script>'
+        f'<script type="application/ld+json">{_WS2}</script>'
+        f'</head><body></body></html>'
+    ),
+    "identical_duplicates": (
+        f'<html><head>'
+        f'<script type="application/ld+json">{_WS1}</script>'
+        f'<script type="application/ld+json">{_WS1}</script>'
+        f'</head><body></body></html>'
+    ),
+    "invalid_json": '''<html><head>
+        <script type="application/ld+json">{invalid json}</script>
+        </head><body></body></html>''',
+}
 
-        try:
-            analysis = analyze_html_file(path)
-            assert len(analysis.extracted_faqs) >= 1
-        finally:
-            os.unlink(path)
 
-    def test_analyze_duplicate_schemas(self):
-        ws1 = '{"@context":"https://schema.org","@type":"WebSite",'
-        ws1 += '"name":"T","url":"https://example.com"}'
-        ws2 = '{"@context":"https://schema.org","@type":"WebSite",'
-        ws2 += '"name":"T2","url":"https://example.com"}'
+@pytest.fixture(scope="module")
+def analyze_files(tmp_path_factory):
+    """Path of each ANALYZE_HTML page; analyze_html_file only reads them."""
+    base = tmp_path_factory.mktemp("analyze")
+    paths = {}
+    for name, html in ANALYZE_HTML.items():
+        path = base / f"{name}.html"
+        path.write_text(html, encoding="utf-8")
+        paths[name] = str(path)
+    return paths
+
+
+class TestAnalyzeHtmlFile:
+    """Tests for analyze_html_file()."""
+
+    def test_analyze_file_with_schemas(self, analyze_files):
+        analysis = analyze_html_file(analyze_files["with_schemas"])
+        assert "WebSite" in analysis.found_types
+        assert analysis.has_head is True
+        assert analysis.total_scripts == 1
+        assert "webapp" in analysis.missing
+        assert "faq" in analysis.missing
+
+    def test_analyze_file_no_schemas(self, analyze_files):
+        analysis = analyze_html_file(analyze_files["no_schemas"])
+        assert analysis.found_types == []
+        assert "website" in analysis.missing
+        assert analysis.total_scripts == 0
+
+    def test_analyze_file_with_faqs(self, analyze_files):
+        analysis = analyze_html_file(analyze_files["with_faqs"])
+        assert len(analysis.extracted_faqs) >= 1
+
+    def test_analyze_duplicate_schemas(self, analyze_files):
+        analysis = analyze_html_file(analyze_files["duplicate_schemas"])
+        assert "WebSite" in analysis.duplicates
+        assert analysis.duplicates["WebSite"] == 2
+
+    def test_analyze_identical_blocks_counted_twice(self, analyze_files):
+        analysis = analyze_html_file(analyze_files["identical_duplicates"])
+        assert analysis.duplicates == {"WebSite": 2}
+        assert [s["index"] for s in analysis.found_schemas] == [0, 1]
+        assert analysis.found_schemas[0]["data"] == analysis.found_schemas[1]["data"]
+
+    def test_analyze_invalid_json_in_script(self, analyze_files):
+        analysis = analyze_html_file(analyze_files["invalid_json"])
+        assert analysis.found_types == []
+
+    @pytest.mark.parametrize("name", sorted(ANALYZE_HTML))
+    def test_analyze_string_matches_file(self, analyze_files, name):
+        from_string = analyze_html_string(ANALYZE_HTML[name])
+        from_file = analyze_html_file(analyze_files[name])
+        assert from_string == from_file
+
+    def test_analyze_file_with_invalid_utf8_bytes(self, tmp_path):
+        path = tmp_path / "latin1.html"
+        path.write_bytes(
+            b'<html><head><title>Caf\xe9</title><script type="application/ld+json">'
+            b'{"@type": "WebSite"}</script></head><body></body></html>'
+        )
+        analysis = analyze_html_file(str(path))
+        assert analysis.found_types == ["WebSite"]
+        assert analysis.has_head is True
+
+    def test_analyze_implied_head_agrees_with_inject(self, tmp_path):
+        """A <head> only implied by <title> is not reported, matching inject's refusal."""
+        html = "<html><title>T</title><body><p>x</p></body></html>"
+        path = tmp_path / "page.html"
+        path.write_text(html, encoding="utf-8")
+
+        assert analyze_html_string(html).has_head is False
+        assert analyze_html_file(str(path)).has_head is False
+        schema = {"@context": "https://schema.org", "@type": "WebSite", "name": "T"}
+        assert inject_schema_into_html(str(path), schema, backup=False, validate=False)[0] is False
+
+    def test_analyze_explicit_head_with_attributes(self):
+        assert analyze_html_string('<html><HEAD lang="en"><title>T</title></HEAD></html>').has_head is True
+
+    def test_analyze_string_empty_document(self):
+        analysis = analyze_html_string("   ")
+        assert analysis.found_types == []
+        assert analysis.has_head is False
+        assert analysis.total_scripts == 0
+
+    def test_analyze_string_with_xml_encoding_declaration(self):
         html = (
-            f'<html><head>'
-            f'<script type="application/ld+json">{ws1}</script>'
-            f'<script type="application/ld+json">{ws2}</script>'
-            f'</head><body></body></html>'
+            '<?xml version="1.0" encoding="iso-8859-1"?>'
+            '<html><head><script type="application/ld+json">{"@type": "WebSite", "name": "Caf\u00e9"}</script>'
+            "</head><body></body></html>"
         )
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".html", delete=False) as f:
-            f.write(html)
-            f.flush()
-            path = f.name
+        analysis = analyze_html_string(html)
+        assert analysis.found_types == ["WebSite"]
+        assert analysis.found_schemas[0]["data"]["name"] == "Caf\u00e9"
 
-        try:
-            analysis = analyze_html_file(path)
-            assert "WebSite" in analysis.duplicates
-            assert analysis.duplicates["WebSite"] == 2
-        finally:
-            os.unlink(path)
-
-    def test_analyze_invalid_json_in_script(self):
-        html = '''<html><head>
-        <script type="application/ld+json">{invalid json}</script>
-        </head><body></body></html>'''
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".html", delete=False) as f:
-            f.write(html)
-            f.flush()
-            path = f.name
+    @pytest.mark.parametrize("depth", [300, 3000])
+    def test_analyze_deeply_nested_page(self, depth):
+        """Content after a deeply nested block is not dropped by libxml2's depth limit."""
+        html = (
+            "<html><head><title>Deep</title></head><body>"
+            + "<div>" * depth
+            + "x"
+            + "</div>" * depth
+            + "<dl><dt>What is GEO exactly?</dt><dd>Generative engine optimization.</dd></dl>"
+            '<script type="application/ld+json">{"@type": "WebSite", "name": "Deep"}</script>'
+            "</body></html>"
+        )
+        analysis = analyze_html_string(html)
+        assert analysis.found_types == ["WebSite"]
+        assert analysis.extracted_faqs == [
+            {"question": "What is GEO exactly?", "answer": "Generative engine optimization."}
+        ]
+        assert analysis.has_head is True
 
-        try:
-            analysis = analyze_html_file(path)
-            assert analysis.found_types == []
-        finally:
-            os.unlink(path)
+    def test_faq_text_of_deeply_nested_answer(self):
+        """FAQ text extraction walks deep subtrees without hitting the recursion limit."""
+        html = (
+            '<html><body><div class="faq"><h3>How deep can it go?</h3>'
+            + "<div>" * 1500
+            + "Deep enough for any page"
+            + "</div>" * 1500
+            + "</div></body></html>"
+        )
+        analysis = analyze_html_string(html)
+        assert analysis.extracted_faqs == [{"question": "How deep can it go?", "answer": "Deep enough for any page"}]
 
 
 class TestInjectSchemaIntoHtml:
@@ -1891,6 +2241,149 @@ class TestInjectSchemaIntoHtml:
         finally:
             os.unlink(path)
 
+    def test_inject_preserves_rest_of_document(self, tmp_path):
+        html = "<!DOCTYPE html>\n<HTML lang=en>\n<head>\n  <title>T</title>\n</HEAD >\n<body><p>x</body></HTML>\n"
+        path = tmp_path / "page.html"
+        path.write_text(html, encoding="utf-8")
+        schema = {"@context": "https://schema.org", "@type": "WebSite", "name": "</script>"}
+
+        success, _ = inject_schema_into_html(str(path), schema, backup=False, validate=False)
+
+        assert success is True
+        head_close = html.index("</HEAD >")
+        expected = html[:head_close] + schema_to_html_tag(schema) + html[head_close:]
+        assert path.read_text(encoding="utf-8") == expected
+
+    def test_inject_backup_keeps_original_and_file_mode(self, tmp_path):
+        html = "<html><head><title>T</title></head><body></body></html>"
+        path = tmp_path / "page.html"
+        path.write_text(html, encoding="utf-8")
+        path.chmod(0o640)
+        schema = {"@context": "https://schema.org", "@type": "WebSite", "name": "T"}
+
+        success, _ = inject_schema_into_html(str(path), schema, backup=True, validate=False)
+
+        assert success is True
+        assert (tmp_path / "page.html.bak").read_text(encoding="utf-8") == html
+        assert "application/ld+json" in path.read_text(encoding="utf-8")
+        assert path.stat().st_mode & 0o777 == 0o640
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["page.html", "page.html.bak"]
+
+    @pytest.mark.skipif(not hasattr(os, "setxattr") or os.geteuid() != 0, reason="needs root and xattrs")
+    def test_inject_backup_keeps_owner_and_xattrs(self, tmp_path):
+        html = "<html><head><title>T</title></head><body></body></html>"
+        path = tmp_path / "page.html"
+        path.write_text(html, encoding="utf-8")
+        try:
+            os.setxattr(path, "user.geo", b"kept")
+        except OSError:
+            pytest.skip("filesystem without user xattrs")
+        os.chown(path, 12345, 23456)
+        os.utime(path, (0, 0))
+        schema = {"@context": "https://schema.org", "@type": "WebSite", "name": "T"}
+
+        success, _ = inject_schema_into_html(str(path), schema, backup=True, validate=False)
+
+        assert success is True
+        st = path.stat()
+        assert (st.st_uid, st.st_gid) == (12345, 23456)
+        assert os.getxattr(path, "user.geo") == b"kept"
+        # The rewritten page gets a fresh mtime; the backup keeps the old one
+        assert st.st_mtime > 0
+        assert (tmp_path / "page.html.bak").stat().st_mtime == 0
+
+    def test_inject_backup_falls_back_to_copy(self, tmp_path):
+        html = "<html><head></head><body></body></html>"
+        path = tmp_path / "page.html"
+        path.write_text(html, encoding="utf-8")
+        schema = {"@context": "https://schema.org", "@type": "WebSite", "name": "T"}
+
+        with patch("geo_optimizer.core.schema_injector.os.link", side_effect=OSError("cross-device")):
+            success, _ = inject_schema_into_html(str(path), schema, backup=True, validate=False)
+
+        assert success is True
+        assert (tmp_path / "page.html.bak").read_text(encoding="utf-8") == html
+
+    def test_inject_backup_through_symlink_keeps_link(self, tmp_path):
+        real = tmp_path / "real.html"
+        real.write_text("<html><head></head><body></body></html>", encoding="utf-8")
+        link = tmp_path / "link.html"
+        link.symlink_to(real)
+        schema = {"@context": "https://schema.org", "@type": "WebSite", "name": "T"}
+
+        success, _ = inject_schema_into_html(str(link), schema, backup=True, validate=False)
+
+        assert success is True
+        assert link.is_symlink()
+        assert "application/ld+json" in real.read_text(encoding="utf-8")
+
+    def test_inject_keeps_crlf_line_endings(self, tmp_path):
+        raw = b"<html>\r\n<head>\r\n<title>T</title>\r\n</head>\r\n<body></body>\r\n</html>\r\n"
+        path = tmp_path / "page.html"
+        path.write_bytes(raw)
+        schema = {"@context": "https://schema.org", "@type": "WebSite", "name": "T"}
+
+        success, _ = inject_schema_into_html(str(path), schema, backup=False, validate=False)
+
+        assert success is True
+        written = path.read_bytes()
+        assert written.startswith(b"<html>\r\n<head>\r\n<title>T</title>\r\n<script")
+        assert written.endswith(b"</head>\r\n<body></body>\r\n</html>\r\n")
+
+    def test_inject_ambiguous_head_close_uses_parser(self, tmp_path):
+        html = "<html><head><!-- </head> --><title>T</title></head><body></body></html>"
+        path = tmp_path / "page.html"
+        path.write_text(html, encoding="utf-8")
+        schema = {"@context": "https://schema.org", "@type": "WebSite", "name": "T"}
+
+        success, _ = inject_schema_into_html(str(path), schema, backup=False, validate=False)
+
+        assert success is True
+        content = path.read_text(encoding="utf-8")
+        assert content.index("<!-- </head> -->") < content.index("application/ld+json")
+        assert content.index("application/ld+json") < content.index("<body>")
+
+    def test_inject_frontmatter_with_ambiguous_head_close(self, tmp_path):
+        """The parser fallback keeps Astro/MD frontmatter and still finds <head>."""
+        html = "---\ntitle: Home\n---\n<html><head><!-- </head> --><title>T</title></head><body></body></html>\n"
+        path = tmp_path / "page.html"
+        path.write_text(html, encoding="utf-8")
+        schema = {"@context": "https://schema.org", "@type": "WebSite", "name": "T"}
+
+        success, msg = inject_schema_into_html(str(path), schema, backup=False, validate=False)
+
+        assert success is True, msg
+        content = path.read_text(encoding="utf-8")
+        assert content.startswith("---\ntitle: Home\n---\n<html><head>")
+        assert content.index("application/ld+json") < content.index("<body>")
+
+    def test_inject_implicit_head_rejected_and_file_untouched(self, tmp_path):
+        """A page without <head> is refused, not rewritten with a synthesized head."""
+        html = "<html><title>T</title><body><p>x</p></body></html>"
+        path = tmp_path / "page.html"
+        path.write_text(html, encoding="utf-8")
+        schema = {"@context": "https://schema.org", "@type": "WebSite", "name": "T"}
+
+        success, msg = inject_schema_into_html(str(path), schema, backup=False, validate=False)
+
+        assert success is False
+        assert "No <head>" in msg
+        assert path.read_text(encoding="utf-8") == html
+
+    def test_inject_non_utf8_file_rejected_untouched(self, tmp_path):
+        """A latin-1 page is refused instead of getting a UTF-8 tag spliced in."""
+        raw = b'<html><head><meta charset="iso-8859-1"><title>Caf\xe9</title></head><body></body></html>'
+        path = tmp_path / "page.html"
+        path.write_bytes(raw)
+        schema = {"@context": "https://schema.org", "@type": "WebSite", "name": "Caf\u00e9"}
+
+        success, msg = inject_schema_into_html(str(path), schema, backup=True, validate=False)
+
+        assert success is False
+        assert "UTF-8" in msg
+        assert path.read_bytes() == raw
+        assert not (tmp_path / "page.html.bak").exists()
+
 
 class TestGenerateAstroSnippet:
     """Tests for generate_astro_snippet()."""
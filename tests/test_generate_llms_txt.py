@@ -998,9 +998,7 @@ class TestMainCLI:
         from generate_llms_txt import main
 
         with patch("sys.argv", ["generate_llms_txt.py", "--base-url", "https://example.com"]):
-            with pytest.raises(SystemExit) as exc_info:
-                main()
-            assert exc_info.value.code == 1
+            assert main() == 1
 
     @patch("generate_llms_txt._ensure_deps")
     @patch("generate_llms_txt.discover_sitemap", return_value="https://example.com/sitemap.xml")
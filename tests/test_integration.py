@@ -16,7 +16,7 @@ import json
 import subprocess
 import sys
 import tempfile
-from io import StringIO
+from contextlib import contextmanager
 from pathlib import Path
 from unittest.mock import Mock, patch
 
@@ -51,6 +51,20 @@ def run_script(script_name, args, timeout=30):
     )
 
 
+@contextmanager
+def patched_main(mod, argv, **overrides):
+    """
+    Patch module attributes and sys.argv around an in-process main() call.
+
+    Args:
+        mod (module): Script module whose attributes are replaced
+        argv (list): Value installed as sys.argv
+        **overrides: Attribute name -> replacement object on ``mod``
+    """
+    with patch.multiple(mod, **overrides), patch("sys.argv", argv):
+        yield
+
+
 # ============================================================================
 # MOCK HELPERS
 # ============================================================================
@@ -153,6 +167,28 @@ def _make_mock_response(text, status_code=200, content=None):
     return resp
 
 
+def _make_fetch_url(homepage_resp, robots_resp, llms_resp):
+    """Create a fetch_url stand-in that dispatches on the exact requested URL."""
+    responses = {
+        "https://example.com/robots.txt": (robots_resp, None),
+        "https://example.com/llms.txt": (llms_resp, None),
+    }
+    homepage = (homepage_resp, None)
+
+    def mock_fetch_url(url, timeout=10):
+        return responses.get(url, homepage)
+
+    return mock_fetch_url
+
+
+@pytest.fixture(scope="session")
+def sample_soup():
+    """SAMPLE_HTML parsed once per session; the audit checks only read the tree."""
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(SAMPLE_HTML, "lxml")
+
+
 # ============================================================================
 # GEO_AUDIT.PY INTEGRATION TESTS
 # ============================================================================
@@ -179,7 +215,7 @@ def test_geo_audit_invalid_url():
     assert result.returncode != 0
 
 
-def test_geo_audit_json_output_structure():
+def test_geo_audit_json_output_structure(capsys):
     """Test that --format json produces valid JSON with expected structure."""
     import geo_audit
 
@@ -187,25 +223,12 @@ def test_geo_audit_json_output_structure():
     robots_resp = _make_mock_response(SAMPLE_ROBOTS_TXT)
     llms_resp = _make_mock_response(SAMPLE_LLMS_TXT)
 
-    def mock_fetch_url(url, timeout=10):
-        if "robots.txt" in url:
-            return robots_resp, None
-        elif "llms.txt" in url:
-            return llms_resp, None
-        else:
-            return homepage_resp, None
-
-    with patch.object(geo_audit, "fetch_url", side_effect=mock_fetch_url), \
-         patch("sys.argv", ["geo_audit.py", "--url", "https://example.com", "--format", "json"]):
-        # Capture stdout
-        captured = StringIO()
-        with patch("sys.stdout", captured):
-            try:
-                geo_audit.main()
-            except SystemExit:
-                pass
-
-    output = captured.getvalue()
+    mock_fetch_url = _make_fetch_url(homepage_resp, robots_resp, llms_resp)
+
+    with patched_main(geo_audit, ["geo_audit.py", "--url", "https://example.com", "--format", "json"], fetch_url=mock_fetch_url):
+        assert geo_audit.main() == 0
+
+    output = capsys.readouterr().out
     data = json.loads(output)
 
     # Validate JSON structure
@@ -227,7 +250,7 @@ def test_geo_audit_json_output_structure():
         assert "details" in data["checks"][check]
 
 
-def test_geo_audit_text_output_default():
+def test_geo_audit_text_output_default(capsys):
     """Test that default output format is text (not JSON)."""
     import geo_audit
 
@@ -235,24 +258,12 @@ def test_geo_audit_text_output_default():
     robots_resp = _make_mock_response(SAMPLE_ROBOTS_TXT)
     llms_resp = _make_mock_response(SAMPLE_LLMS_TXT)
 
-    def mock_fetch_url(url, timeout=10):
-        if "robots.txt" in url:
-            return robots_resp, None
-        elif "llms.txt" in url:
-            return llms_resp, None
-        else:
-            return homepage_resp, None
-
-    with patch.object(geo_audit, "fetch_url", side_effect=mock_fetch_url), \
-         patch("sys.argv", ["geo_audit.py", "--url", "https://example.com"]):
-        captured = StringIO()
-        with patch("sys.stdout", captured):
-            try:
-                geo_audit.main()
-            except SystemExit:
-                pass
-
-    output = captured.getvalue()
+    mock_fetch_url = _make_fetch_url(homepage_resp, robots_resp, llms_resp)
+
+    with patched_main(geo_audit, ["geo_audit.py", "--url", "https://example.com"], fetch_url=mock_fetch_url):
+        assert geo_audit.main() == 0
+
+    output = capsys.readouterr().out
 
     # Text output should NOT be valid JSON
     try:
@@ -273,29 +284,17 @@ def test_geo_audit_output_file():
     robots_resp = _make_mock_response(SAMPLE_ROBOTS_TXT)
     llms_resp = _make_mock_response(SAMPLE_LLMS_TXT)
 
-    def mock_fetch_url(url, timeout=10):
-        if "robots.txt" in url:
-            return robots_resp, None
-        elif "llms.txt" in url:
-            return llms_resp, None
-        else:
-            return homepage_resp, None
+    mock_fetch_url = _make_fetch_url(homepage_resp, robots_resp, llms_resp)
 
     with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
         output_path = f.name
 
     try:
-        with patch.object(geo_audit, "fetch_url", side_effect=mock_fetch_url), \
-             patch("sys.argv", [
-                 "geo_audit.py", "--url", "https://example.com",
-                 "--format", "json", "--output", output_path
-             ]):
-            captured = StringIO()
-            with patch("sys.stdout", captured):
-                try:
-                    geo_audit.main()
-                except SystemExit:
-                    pass
+        with patched_main(geo_audit, [
+            "geo_audit.py", "--url", "https://example.com",
+            "--format", "json", "--output", output_path
+        ], fetch_url=mock_fetch_url):
+            assert geo_audit.main() == 0
 
         # Check file was created
         assert Path(output_path).exists()
@@ -314,31 +313,25 @@ def test_geo_audit_output_file():
         Path(output_path).unlink(missing_ok=True)
 
 
-def test_geo_audit_json_network_error():
+def test_geo_audit_json_network_error(capsys):
     """Test that JSON output handles network errors gracefully."""
     import geo_audit
 
     def mock_fetch_url(url, timeout=10):
         return None, "Connection refused"
 
-    with patch.object(geo_audit, "fetch_url", side_effect=mock_fetch_url), \
-         patch("sys.argv", [
-             "geo_audit.py", "--url", "https://example.com", "--format", "json"
-         ]):
-        captured = StringIO()
-        with patch("sys.stdout", captured):
-            with pytest.raises(SystemExit) as exc_info:
-                geo_audit.main()
-
-        assert exc_info.value.code == 1
+    with patched_main(geo_audit, [
+        "geo_audit.py", "--url", "https://example.com", "--format", "json"
+    ], fetch_url=mock_fetch_url):
+        assert geo_audit.main() == 1
 
-    output = captured.getvalue()
+    output = capsys.readouterr().out
     data = json.loads(output)
     assert "error" in data
     assert "url" in data
 
 
-def test_geo_audit_score_range():
+def test_geo_audit_score_range(capsys):
     """Test that the computed score falls within valid range for a well-configured site."""
     import geo_audit
 
@@ -346,26 +339,14 @@ def test_geo_audit_score_range():
     robots_resp = _make_mock_response(SAMPLE_ROBOTS_TXT)
     llms_resp = _make_mock_response(SAMPLE_LLMS_TXT)
 
-    def mock_fetch_url(url, timeout=10):
-        if "robots.txt" in url:
-            return robots_resp, None
-        elif "llms.txt" in url:
-            return llms_resp, None
-        else:
-            return homepage_resp, None
-
-    with patch.object(geo_audit, "fetch_url", side_effect=mock_fetch_url), \
-         patch("sys.argv", [
-             "geo_audit.py", "--url", "https://example.com", "--format", "json"
-         ]):
-        captured = StringIO()
-        with patch("sys.stdout", captured):
-            try:
-                geo_audit.main()
-            except SystemExit:
-                pass
-
-    output = captured.getvalue()
+    mock_fetch_url = _make_fetch_url(homepage_resp, robots_resp, llms_resp)
+
+    with patched_main(geo_audit, [
+        "geo_audit.py", "--url", "https://example.com", "--format", "json"
+    ], fetch_url=mock_fetch_url):
+        assert geo_audit.main() == 0
+
+    output = capsys.readouterr().out
     data = json.loads(output)
 
     score = data["score"]
@@ -375,6 +356,25 @@ def test_geo_audit_score_range():
     assert score > 40, f"Score {score} unexpectedly low for a well-configured mock site"
 
 
+def test_geo_audit_schema_on_sample_page(sample_soup):
+    """Test that audit_schema detects the WebSite block in SAMPLE_HTML."""
+    import geo_audit
+
+    result = geo_audit.audit_schema(sample_soup, "https://example.com")
+
+    assert result["has_website"] is True
+    assert result["found_types"] == ["WebSite"]
+
+
+def test_geo_audit_meta_tags_on_sample_page(sample_soup):
+    """Test that audit_meta_tags finds every meta tag declared in SAMPLE_HTML."""
+    import geo_audit
+
+    result = geo_audit.audit_meta_tags(sample_soup, "https://example.com")
+
+    assert all(result.values()), result
+
+
 # ============================================================================
 # GENERATE_LLMS_TXT.PY INTEGRATION TESTS
 # ============================================================================
@@ -408,16 +408,15 @@ def test_generate_llms_txt_output():
         output_path = f.name
 
     try:
-        with patch.object(generate_llms_txt, "discover_sitemap",
-                          return_value="https://example.com/sitemap.xml"), \
-             patch.object(generate_llms_txt, "fetch_sitemap",
-                          return_value=sitemap_urls), \
-             patch("sys.argv", [
-                 "generate_llms_txt.py",
-                 "--base-url", "https://example.com",
-                 "--output", output_path,
-                 "--site-name", "Example Site"
-             ]):
+        argv = [
+            "generate_llms_txt.py",
+            "--base-url", "https://example.com",
+            "--output", output_path,
+            "--site-name", "Example Site"
+        ]
+        with patched_main(generate_llms_txt, argv,
+                          discover_sitemap=Mock(return_value="https://example.com/sitemap.xml"),
+                          fetch_sitemap=Mock(return_value=sitemap_urls)):
             generate_llms_txt.main()
 
         assert Path(output_path).exists()
@@ -446,14 +445,13 @@ def test_generate_llms_txt_no_sitemap_creates_minimal():
         output_path = f.name
 
     try:
-        with patch.object(generate_llms_txt, "discover_sitemap",
-                          return_value=None), \
-             patch("sys.argv", [
-                 "generate_llms_txt.py",
-                 "--base-url", "https://example.com",
-                 "--output", output_path,
-                 "--site-name", "Example Site"
-             ]):
+        argv = [
+            "generate_llms_txt.py",
+            "--base-url", "https://example.com",
+            "--output", output_path,
+            "--site-name", "Example Site"
+        ]
+        with patched_main(generate_llms_txt, argv, discover_sitemap=Mock(return_value=None)):
             generate_llms_txt.main()
 
         assert Path(output_path).exists()
@@ -469,7 +467,7 @@ def test_generate_llms_txt_no_sitemap_creates_minimal():
         Path(output_path).unlink(missing_ok=True)
 
 
-def test_generate_llms_txt_stdout():
+def test_generate_llms_txt_stdout(capsys):
     """Test that llms.txt output goes to stdout when --output is not specified."""
     import generate_llms_txt
 
@@ -478,20 +476,17 @@ def test_generate_llms_txt_stdout():
         {"url": "https://example.com/about", "lastmod": None, "priority": 0.8, "title": None},
     ]
 
-    with patch.object(generate_llms_txt, "discover_sitemap",
-                      return_value="https://example.com/sitemap.xml"), \
-         patch.object(generate_llms_txt, "fetch_sitemap",
-                      return_value=sitemap_urls), \
-         patch("sys.argv", [
-             "generate_llms_txt.py",
-             "--base-url", "https://example.com",
-             "--site-name", "Example Site"
-         ]):
-        captured = StringIO()
-        with patch("sys.stdout", captured):
-            generate_llms_txt.main()
+    argv = [
+        "generate_llms_txt.py",
+        "--base-url", "https://example.com",
+        "--site-name", "Example Site"
+    ]
+    with patched_main(generate_llms_txt, argv,
+                      discover_sitemap=Mock(return_value="https://example.com/sitemap.xml"),
+                      fetch_sitemap=Mock(return_value=sitemap_urls)):
+        generate_llms_txt.main()
 
-    output = captured.getvalue()
+    output = capsys.readouterr().out
     assert "# Example Site" in output
 
 
@@ -645,18 +640,12 @@ def test_geo_audit_connection_error_handling():
     def mock_fetch_url(url, timeout=10):
         return None, "Connection refused after 3 retries"
 
-    with patch.object(geo_audit, "fetch_url", side_effect=mock_fetch_url), \
-         patch("sys.argv", ["geo_audit.py", "--url", "https://unreachable.example.com"]):
-        captured = StringIO()
-        with patch("sys.stdout", captured):
-            with pytest.raises(SystemExit) as exc_info:
-                geo_audit.main()
-
+    with patched_main(geo_audit, ["geo_audit.py", "--url", "https://unreachable.example.com"], fetch_url=mock_fetch_url):
         # Should exit with non-zero code
-        assert exc_info.value.code != 0
+        assert geo_audit.main() != 0
 
 
-def test_geo_audit_robots_not_found():
+def test_geo_audit_robots_not_found(capsys):
     """Test behavior when robots.txt returns 404."""
     import geo_audit
 
@@ -664,26 +653,14 @@ def test_geo_audit_robots_not_found():
     robots_404 = _make_mock_response("Not Found", status_code=404)
     llms_404 = _make_mock_response("Not Found", status_code=404)
 
-    def mock_fetch_url(url, timeout=10):
-        if "robots.txt" in url:
-            return robots_404, None
-        elif "llms.txt" in url:
-            return llms_404, None
-        else:
-            return homepage_resp, None
-
-    with patch.object(geo_audit, "fetch_url", side_effect=mock_fetch_url), \
-         patch("sys.argv", [
-             "geo_audit.py", "--url", "https://example.com", "--format", "json"
-         ]):
-        captured = StringIO()
-        with patch("sys.stdout", captured):
-            try:
-                geo_audit.main()
-            except SystemExit:
-                pass
-
-    output = captured.getvalue()
+    mock_fetch_url = _make_fetch_url(homepage_resp, robots_404, llms_404)
+
+    with patched_main(geo_audit, [
+        "geo_audit.py", "--url", "https://example.com", "--format", "json"
+    ], fetch_url=mock_fetch_url):
+        assert geo_audit.main() == 0
+
+    output = capsys.readouterr().out
     data = json.loads(output)
 
     # Should still produce valid JSON with lower score
@@ -711,13 +688,3 @@ def test_scripts_are_executable():
 
         assert first_line.startswith("#!/usr/bin/env python3"), \
             f"{script_name} missing proper shebang"
-
-
-def test_all_scripts_help_exits_zero():
-    """Test that all scripts return exit code 0 for --help."""
-    scripts = ["geo_audit.py", "generate_llms_txt.py", "schema_injector.py"]
-
-    for script_name in scripts:
-        result = run_script(script_name, ["--help"])
-        assert result.returncode == 0, \
-            f"{script_name} --help returned {result.returncode}: {result.stderr}"
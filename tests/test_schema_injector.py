@@ -14,6 +14,7 @@ Author: Juan Camilo Auriti
 """
 
 import json
+import os
 import sys
 from pathlib import Path
 from unittest.mock import patch
@@ -28,6 +29,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
 from schema_injector import (
     SCHEMA_TEMPLATES,
     analyze_html_file,
+    analyze_html_string,
     extract_faq_from_html,
     fill_template,
     generate_faq_schema,
@@ -175,7 +177,7 @@ class TestExtractFaqFromHtml:
         """Helper to create a BeautifulSoup object from HTML."""
         from bs4 import BeautifulSoup
 
-        return BeautifulSoup(html, "html.parser")
+        return BeautifulSoup(html, "lxml")
 
     def test_extract_dt_dd_pattern(self):
         """Test FAQ extraction from <dt>/<dd> pairs."""
@@ -306,14 +308,11 @@ class TestAnalyzeHtmlFile:
         assert "website" not in result["missing"]
         assert result["has_head"] is True
 
-    def test_reports_missing_schemas(self, tmp_path):
+    def test_reports_missing_schemas(self):
         """Test that missing schemas are reported when no JSON-LD exists."""
         html = "<html><head></head><body><p>Hello</p></body></html>"
 
-        html_file = tmp_path / "index.html"
-        html_file.write_text(html, encoding="utf-8")
-
-        result = analyze_html_file(str(html_file))
+        result = analyze_html_string(html)
 
         assert len(result["found_schemas"]) == 0
         assert "website" in result["missing"]
@@ -321,7 +320,7 @@ class TestAnalyzeHtmlFile:
         assert "faq" in result["missing"]
         assert result["total_scripts"] == 0
 
-    def test_detects_duplicate_schemas(self, tmp_path):
+    def test_detects_duplicate_schemas(self):
         """Test that duplicate schemas of the same type are flagged."""
         schema = json.dumps(
             {"@context": "https://schema.org", "@type": "WebSite", "name": "Test", "url": "https://example.com"}
@@ -331,42 +330,33 @@ class TestAnalyzeHtmlFile:
         <script type="application/ld+json">{schema}</script>
         </head><body></body></html>"""
 
-        html_file = tmp_path / "duplicate.html"
-        html_file.write_text(html, encoding="utf-8")
-
-        result = analyze_html_file(str(html_file))
+        result = analyze_html_string(html)
 
         assert result["duplicates"].get("WebSite") == 2
 
-    def test_malformed_jsonld_handled_gracefully(self, tmp_path):
+    def test_malformed_jsonld_handled_gracefully(self):
         """Test that malformed JSON-LD does not crash the analysis."""
         html = """<html><head>
         <script type="application/ld+json">{this is not valid json</script>
         </head><body></body></html>"""
 
-        html_file = tmp_path / "bad.html"
-        html_file.write_text(html, encoding="utf-8")
-
-        result = analyze_html_file(str(html_file))
+        result = analyze_html_string(html)
 
         assert len(result["found_schemas"]) == 0
         assert result["total_scripts"] == 1
 
-    def test_malformed_jsonld_verbose_prints_warning(self, tmp_path, capsys):
+    def test_malformed_jsonld_verbose_prints_warning(self, capsys):
         """Test that malformed JSON-LD prints a warning in verbose mode."""
         html = """<html><head>
         <script type="application/ld+json">{broken json}</script>
         </head><body></body></html>"""
 
-        html_file = tmp_path / "bad.html"
-        html_file.write_text(html, encoding="utf-8")
-
-        analyze_html_file(str(html_file), verbose=True)
+        analyze_html_string(html, verbose=True)
 
         captured = capsys.readouterr()
         assert "Invalid JSON" in captured.out
 
-    def test_array_schema_parsed(self, tmp_path):
+    def test_array_schema_parsed(self):
         """Test that array-format JSON-LD (multiple schemas in one tag) is parsed."""
         schemas = [
             {"@context": "https://schema.org", "@type": "WebSite", "name": "Test", "url": "https://example.com"},
@@ -376,27 +366,34 @@ class TestAnalyzeHtmlFile:
         <script type="application/ld+json">{json.dumps(schemas)}</script>
         </head><body></body></html>"""
 
-        html_file = tmp_path / "array.html"
-        html_file.write_text(html, encoding="utf-8")
-
-        result = analyze_html_file(str(html_file))
+        result = analyze_html_string(html)
 
         assert len(result["found_schemas"]) == 2
         assert "WebSite" in result["found_types"]
         assert "Organization" in result["found_types"]
 
-    def test_no_head_tag_detected(self, tmp_path):
+    def test_no_head_tag_detected(self):
         """Test that absence of <head> is correctly reported."""
         html = "<html><body><p>No head tag</p></body></html>"
 
-        html_file = tmp_path / "nohead.html"
-        html_file.write_text(html, encoding="utf-8")
+        result = analyze_html_string(html)
 
-        result = analyze_html_file(str(html_file))
+        assert result["has_head"] is False
+
+    @pytest.mark.parametrize(
+        "html",
+        [
+            "<html><title>T</title><body><p>Implied head</p></body></html>",
+            '<html><meta charset="utf-8"><header><p>x</p></header><body></body></html>',
+        ],
+    )
+    def test_implied_head_not_reported(self, html):
+        """Test that a <head> the parser only implies is not reported as present."""
+        result = analyze_html_string(html)
 
         assert result["has_head"] is False
 
-    def test_extracts_faqs_when_faqpage_missing(self, tmp_path):
+    def test_extracts_faqs_when_faqpage_missing(self):
         """Test that FAQs are auto-extracted when FAQPage schema is absent."""
         html = """<html><head></head><body>
         <dl>
@@ -405,10 +402,7 @@ class TestAnalyzeHtmlFile:
         </dl>
         </body></html>"""
 
-        html_file = tmp_path / "faq.html"
-        html_file.write_text(html, encoding="utf-8")
-
-        result = analyze_html_file(str(html_file))
+        result = analyze_html_string(html)
 
         assert len(result["extracted_faqs"]) == 1
         assert "GEO Optimizer" in result["extracted_faqs"][0]["question"]
@@ -486,8 +480,76 @@ class TestInjectSchemaIntoHtml:
         assert 'application/ld+json' in content
         assert '"@type": "WebSite"' in content
 
+    def test_injection_leaves_rest_of_markup_untouched(self, tmp_path):
+        """Test that only the schema tag is added; the original markup is kept as-is."""
+        html = "<!DOCTYPE html>\n<html>\n<head><title>Test</title>\n</head>\n<body><br></body>\n</html>\n"
+        html_file = tmp_path / "splice.html"
+        html_file.write_text(html, encoding="utf-8")
+
+        result = inject_schema_into_html(str(html_file), self.VALID_SCHEMA, backup=False, validate=False)
+
+        assert result is True
+        pos = html.index("</head>")
+        expected = html[:pos] + schema_to_html_tag(self.VALID_SCHEMA) + html[pos:]
+        assert html_file.read_text(encoding="utf-8") == expected
+
+    def test_frontmatter_with_ambiguous_head_close(self, tmp_path):
+        """Test that the parser fallback keeps frontmatter and still finds <head>."""
+        html = "---\ntitle: Home\n---\n<html><head><!-- </head> --><title>T</title></head><body></body></html>\n"
+        html_file = tmp_path / "frontmatter.html"
+        html_file.write_text(html, encoding="utf-8")
+
+        result = inject_schema_into_html(str(html_file), self.VALID_SCHEMA, backup=False, validate=False)
+
+        assert result is True
+        content = html_file.read_text(encoding="utf-8")
+        assert content.startswith("---\ntitle: Home\n---\n<html><head>")
+        assert content.index("application/ld+json") < content.index("<body>")
+
+    def test_implicit_head_rejected_and_file_untouched(self, tmp_path):
+        """Test that a page without <head> is refused rather than rewritten."""
+        html = "<html><title>T</title><body><p>x</p></body></html>"
+        html_file = tmp_path / "no_head.html"
+        html_file.write_text(html, encoding="utf-8")
+
+        result = inject_schema_into_html(str(html_file), self.VALID_SCHEMA, backup=False, validate=False)
+
+        assert result is False
+        assert html_file.read_text(encoding="utf-8") == html
+
+    def test_non_utf8_file_rejected_untouched(self, tmp_path):
+        """Test that a latin-1 page is refused instead of becoming mixed-encoding."""
+        raw = b'<html><head><meta charset="iso-8859-1"><title>Caf\xe9</title></head><body></body></html>'
+        html_file = tmp_path / "latin1.html"
+        html_file.write_bytes(raw)
+        schema = dict(self.VALID_SCHEMA, name="Caf\u00e9")
+
+        result = inject_schema_into_html(str(html_file), schema, backup=True, validate=False)
+
+        assert result is False
+        assert html_file.read_bytes() == raw
+        assert not (tmp_path / "latin1.html.bak").exists()
+
+    @pytest.mark.skipif(not hasattr(os, "setxattr") or os.geteuid() != 0, reason="needs root and xattrs")
+    def test_backup_keeps_owner_and_xattrs(self, tmp_path):
+        """Test that the swapped-in file keeps owner, group and xattrs of the original."""
+        html_file = tmp_path / "owned.html"
+        html_file.write_text("<html><head><title>Test</title></head><body></body></html>", encoding="utf-8")
+        try:
+            os.setxattr(html_file, "user.geo", b"kept")
+        except OSError:
+            pytest.skip("filesystem without user xattrs")
+        os.chown(html_file, 12345, 23456)
+
+        result = inject_schema_into_html(str(html_file), self.VALID_SCHEMA, backup=True, validate=False)
+
+        assert result is True
+        st = html_file.stat()
+        assert (st.st_uid, st.st_gid) == (12345, 23456)
+        assert os.getxattr(html_file, "user.geo") == b"kept"
+
     def test_backup_created_with_copy(self, tmp_path):
-        """Test that backup is created using copy (original file preserved)."""
+        """Test that the backup keeps the original content while the file is rewritten."""
         html = "<html><head><title>Test</title></head><body></body></html>"
         html_file = tmp_path / "backup_test.html"
         html_file.write_text(html, encoding="utf-8")
@@ -497,7 +559,7 @@ class TestInjectSchemaIntoHtml:
 
         assert result is True
 
-        # Original file should still exist (shutil.copy2, not rename)
+        # Original file should still exist at its path
         assert html_file.exists()
 
         # Backup file should also exist
@@ -594,21 +656,29 @@ class TestInjectSchemaIntoHtml:
         html_file.write_text(html, encoding="utf-8")
 
         with patch("schema_validator.validate_jsonld", return_value=(True, None)):
-            inject_schema_into_html(str(html_file), self.VALID_SCHEMA, backup=False)
-
-        content = html_file.read_text(encoding="utf-8")
-
-        # Parse the file with BeautifulSoup and extract the JSON-LD
-        from bs4 import BeautifulSoup
+            result = inject_schema_into_html(str(html_file), self.VALID_SCHEMA, backup=False, return_result=True)
 
-        soup = BeautifulSoup(content, "html.parser")
-        script = soup.find("script", type="application/ld+json")
-        assert script is not None
+        assert result
+        assert result.final_bytes == html_file.read_bytes()
+        assert result.script_text.encode("utf-8") in result.final_bytes
 
-        parsed = json.loads(script.string.strip())
+        parsed = json.loads(result.script_text)
         assert parsed["@type"] == "WebSite"
         assert parsed["name"] == "Test Site"
 
+    def test_return_result_falsy_on_failure(self, tmp_path):
+        """Test that a failed injection returns a falsy InjectResult without payload."""
+        html_file = tmp_path / "no_head.html"
+        html_file.write_text("<html><body></body></html>", encoding="utf-8")
+
+        result = inject_schema_into_html(
+            str(html_file), self.VALID_SCHEMA, backup=False, validate=False, return_result=True
+        )
+
+        assert not result
+        assert result.script_text is None
+        assert result.final_bytes is None
+
 
 # ============================================================================
 # print_analysis TESTS
@@ -915,22 +985,35 @@ class TestEdgeCases:
         # Empty list should result in schema_type = None
         mock_validate.assert_called_once_with(schema, None, strict=False)
 
-    def test_analyze_script_with_no_string_content(self, tmp_path):
-        """Test analyze_html_file when script tag has no string content (empty tag)."""
+    def test_analyze_faqpage_word_outside_schema_still_extracts_faqs(self):
+        """A page mentioning "FAQPage" in plain text still gets its FAQs extracted."""
+        html = """<html><head></head><body>
+        <p>We have no FAQPage schema yet.</p>
+        <dl>
+            <dt>What is GEO Optimizer used for?</dt>
+            <dd>GEO Optimizer helps websites become visible to AI search engines like ChatGPT.</dd>
+        </dl>
+        </body></html>"""
+
+        result = analyze_html_string(html)
+
+        assert "faq" in result["missing"]
+        assert len(result["extracted_faqs"]) == 1
+        assert result["has_head"] is True
+
+    def test_analyze_script_with_no_string_content(self):
+        """Test analysis when script tag has no string content (empty tag)."""
         html = """<html><head>
         <script type="application/ld+json"></script>
         </head><body></body></html>"""
 
-        html_file = tmp_path / "empty_script.html"
-        html_file.write_text(html, encoding="utf-8")
-
-        result = analyze_html_file(str(html_file))
+        result = analyze_html_string(html)
 
         # Empty script tag should not produce any found schemas
         assert len(result["found_schemas"]) == 0
         assert result["total_scripts"] == 1
 
-    def test_analyze_does_not_extract_faq_when_faqpage_present(self, tmp_path):
+    def test_analyze_does_not_extract_faq_when_faqpage_present(self):
         """Test that FAQ extraction is skipped when FAQPage schema already exists."""
         faq_schema = json.dumps({
             "@context": "https://schema.org",
@@ -946,10 +1029,7 @@ class TestEdgeCases:
         </dl>
         </body></html>"""
 
-        html_file = tmp_path / "has_faq.html"
-        html_file.write_text(html, encoding="utf-8")
-
-        result = analyze_html_file(str(html_file))
+        result = analyze_html_string(html)
 
         # FAQPage is present, so extracted_faqs should be empty
         assert result["extracted_faqs"] == []
@@ -983,6 +1063,15 @@ class TestEdgeCases:
         assert "Generative Engine Optimization" in result
         assert '<script type="application/ld+json">' in result
 
+    def test_schema_to_html_tag_body_is_indented_json(self):
+        """Test that the tag body matches json.dumps(indent=2) with or without orjson."""
+        schema = {"@type": "WebSite", "name": "Caf\u00e9", "sameAs": [], "nested": {"a": [1, 2.5, None]}}
+
+        result = schema_to_html_tag(schema)
+
+        body = result.split("\n", 1)[1].rsplit("\n", 1)[0]
+        assert body == json.dumps(schema, indent=2, ensure_ascii=False)
+
     def test_extract_faq_class_pattern_with_question_class(self):
         """Test FAQ extraction using elements with 'question' CSS class."""
         html = """
@@ -992,7 +1081,7 @@ class TestEdgeCases:
         </div>
         """
         from bs4 import BeautifulSoup
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         faqs = extract_faq_from_html(soup)
 
         assert len(faqs) == 1
@@ -1024,16 +1113,13 @@ class TestEdgeCases:
 
         assert result is False
 
-    def test_analyze_generic_exception_in_script(self, tmp_path, capsys):
+    def test_analyze_generic_exception_in_script(self, capsys):
         """Test that a generic Exception in script parsing is handled gracefully."""
         # Create valid HTML with a script tag
         html = """<html><head>
         <script type="application/ld+json">{"@context": "https://schema.org", "@type": "WebSite"}</script>
         </head><body></body></html>"""
 
-        html_file = tmp_path / "exc.html"
-        html_file.write_text(html, encoding="utf-8")
-
         # Patch json.loads to raise a generic Exception (not JSONDecodeError)
         original_loads = json.loads
 
@@ -1044,12 +1130,77 @@ class TestEdgeCases:
             return original_loads(s, *args, **kwargs)
 
         with patch("json.loads", side_effect=patched_loads):
-            result = analyze_html_file(str(html_file), verbose=True)
+            result = analyze_html_string(html, verbose=True)
 
         captured = capsys.readouterr()
         assert "Error parsing script tag" in captured.out
         assert len(result["found_schemas"]) == 0
 
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_main_analyze_directory(self, tmp_path, capsys, jobs):
+        """Test main() --dir analyzes every HTML file, serially or in a process pool."""
+        from schema_injector import main
+
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "a.html").write_text("<html><head></head><body></body></html>", encoding="utf-8")
+        (tmp_path / "sub" / "b.htm").write_text("<html><body></body></html>", encoding="utf-8")
+        (tmp_path / "notes.txt").write_text("not html", encoding="utf-8")
+
+        argv = ["schema_injector.py", "--dir", str(tmp_path), "--analyze", "--jobs", jobs]
+        with patch("sys.argv", argv):
+            assert main() == 0
+
+        out = capsys.readouterr().out
+        assert out.count("SCHEMA ANALYSIS") == 2
+        assert out.index("a.html") < out.index("b.htm")
+        assert "Analyzed 2 HTML files" in out
+
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_main_analyze_directory_with_unreadable_file(self, tmp_path, capsys, jobs):
+        """Test main() --dir reports a bad file, analyzes the rest, and exits non-zero."""
+        from schema_injector import main
+
+        (tmp_path / "a.html").write_text(
+            '<html><head><script type="application/ld+json">{not json}</script></head></html>',
+            encoding="utf-8",
+        )
+        (tmp_path / "b.html").write_bytes(b"<html><head><title>Caf\xe9</title></head></html>")
+        (tmp_path / "c.html").write_text("<html><head></head><body></body></html>", encoding="utf-8")
+
+        argv = ["schema_injector.py", "--dir", str(tmp_path), "--analyze", "--verbose", "--jobs", jobs]
+        with patch("sys.argv", argv):
+            assert main() == 1
+
+        out = capsys.readouterr().out
+        assert out.count("SCHEMA ANALYSIS") == 2
+        # Warnings stay under the header of the file they belong to
+        assert out.index("a.html") < out.index("Invalid JSON") < out.index("b.html")
+        assert out.index("b.html") < out.index("UnicodeDecodeError") < out.index("c.html")
+        assert "Analyzed 2 HTML files" in out
+        assert "1 file(s) could not be analyzed" in out
+
+    @pytest.mark.parametrize("jobs", ["0", "-2", "two"])
+    def test_main_analyze_directory_rejects_bad_jobs(self, tmp_path, capsys, jobs):
+        """Test main() --jobs must be a positive integer (argparse error, no traceback)."""
+        from schema_injector import main
+
+        (tmp_path / "a.html").write_text("<html><head></head></html>", encoding="utf-8")
+        argv = ["schema_injector.py", "--dir", str(tmp_path), "--analyze", "--jobs", jobs]
+        with patch("sys.argv", argv), pytest.raises(SystemExit) as exc:
+            main()
+
+        assert exc.value.code == 2
+        assert "--jobs" in capsys.readouterr().err
+
+    def test_main_analyze_empty_directory(self, tmp_path, capsys):
+        """Test main() --dir fails cleanly when there is nothing to analyze."""
+        from schema_injector import main
+
+        with patch("sys.argv", ["schema_injector.py", "--dir", str(tmp_path), "--analyze"]):
+            assert main() == 1
+
+        assert "No HTML files found" in capsys.readouterr().out
+
     def test_main_analyze_mode(self, tmp_path, capsys):
         """Test main() in --analyze mode."""
         from schema_injector import main
@@ -1068,9 +1219,7 @@ class TestEdgeCases:
         html_file.write_text(html, encoding="utf-8")
 
         with patch("sys.argv", ["schema_injector.py", "--file", str(html_file), "--analyze"]):
-            with pytest.raises(SystemExit) as exc_info:
-                main()
-            assert exc_info.value.code == 0
+            assert main() == 0
 
         captured = capsys.readouterr()
         assert "SCHEMA ANALYSIS" in captured.out
@@ -1092,6 +1241,24 @@ class TestEdgeCases:
         assert "application/ld+json" in captured.out
         assert "TestSite" in captured.out
 
+    def test_main_generate_does_not_import_parsers(self):
+        """Test that generating a schema never imports bs4/lxml (import cost stays off the CLI path)."""
+        import subprocess
+
+        scripts_dir = Path(__file__).resolve().parent.parent / "scripts"
+        code = (
+            "import sys\n"
+            f"sys.path.insert(0, {str(scripts_dir)!r})\n"
+            "import schema_injector\n"
+            "sys.argv = ['schema_injector.py', '--type', 'website', '--name', 'T', '--url', 'https://example.com']\n"
+            "schema_injector.main()\n"
+            "print('LOADED', sorted(m for m in ('bs4', 'lxml') if m in sys.modules))\n"
+        )
+        proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=60)
+
+        assert proc.returncode == 0, proc.stderr
+        assert "LOADED []" in proc.stdout
+
     def test_main_astro_mode(self, capsys):
         """Test main() in --astro mode."""
         from schema_injector import main
@@ -1103,9 +1270,7 @@ class TestEdgeCases:
             "--url", "https://astro.example.com",
             "--astro",
         ]):
-            with pytest.raises(SystemExit) as exc_info:
-                main()
-            assert exc_info.value.code == 0
+            assert main() == 0
 
         captured = capsys.readouterr()
         assert "AstroSite" in captured.out
@@ -1117,9 +1282,7 @@ class TestEdgeCases:
         from schema_injector import main
 
         with patch("sys.argv", ["schema_injector.py"]):
-            with pytest.raises(SystemExit) as exc_info:
-                main()
-            assert exc_info.value.code == 1
+            assert main() == 1
 
     def test_main_inject_mode(self, tmp_path, capsys):
         """Test main() in --inject mode with --no-validate."""
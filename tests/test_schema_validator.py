@@ -214,6 +214,13 @@ def test_get_required_fields_unknown_type():
     assert len(fields) == 2  # Only default fields
 
 
+def test_get_required_fields_cached_and_immutable():
+    """Test get_required_fields returns the same immutable tuple on repeated calls."""
+    fields = get_required_fields("website")
+    assert isinstance(fields, tuple)
+    assert get_required_fields("website") is fields
+
+
 def test_schema_not_dict():
     """Test validation fails when schema is not a dict."""
     is_valid, error = validate_jsonld("not-a-dict")
@@ -6,9 +6,10 @@ Copre:
 - #56 SSRF bypass — reti IP aggiuntive bloccate
 """
 
+import socket
 from unittest.mock import patch
 
-from geo_optimizer.utils.validators import validate_public_url
+from geo_optimizer.utils.validators import _DNS_CACHE_TTL, validate_public_url
 from geo_optimizer.web.badge import (
     BAND_COLORS,
     _MAX_LABEL_LENGTH,
@@ -183,12 +184,13 @@ class TestSsrfBypassNetworks:
     def test_reti_rfc1918_ancora_bloccate(self):
         """Reti RFC 1918 originali continuano a essere bloccate."""
         test_ips = ["10.0.0.1", "172.16.0.1", "192.168.1.1"]
-        for ip in test_ips:
+        for i, ip in enumerate(test_ips):
             with patch(
                 "geo_optimizer.utils.validators.socket.getaddrinfo"
             ) as mock_dns:
                 mock_dns.return_value = [(2, 1, 6, "", (ip, 0))]
-                ok, err = validate_public_url("https://evil.example.com")
+                # Hostname diverso per IP: la cache DNS restituirebbe la prima risoluzione
+                ok, err = validate_public_url(f"https://evil-{i}.example.com")
                 assert ok is False, f"{ip} dovrebbe essere bloccato"
 
     def test_loopback_ipv6(self):
@@ -197,3 +199,35 @@ class TestSsrfBypassNetworks:
             mock_dns.return_value = [(10, 1, 6, "", ("::1", 0, 0, 0))]
             ok, err = validate_public_url("https://evil.example.com")
             assert ok is False
+
+
+class TestCacheDns:
+    """Test cache TTL delle risoluzioni DNS in validate_public_url."""
+
+    def test_hostname_risolto_una_volta(self):
+        """URL dello stesso host riusano la risoluzione in cache."""
+        with patch("geo_optimizer.utils.validators.socket.getaddrinfo") as mock_dns:
+            mock_dns.return_value = [(2, 1, 6, "", ("93.184.216.34", 0))]
+            for path in ("/", "/a", "/b"):
+                ok, _ = validate_public_url(f"https://example.com{path}")
+                assert ok is True
+        mock_dns.assert_called_once()
+
+    def test_errore_dns_non_memorizzato(self):
+        """Un host che non risolve viene ritentato alla chiamata successiva."""
+        with patch("geo_optimizer.utils.validators.socket.getaddrinfo") as mock_dns:
+            mock_dns.side_effect = [socket.gaierror("nope"), [(2, 1, 6, "", ("10.0.0.1", 0))]]
+            assert validate_public_url("https://flaky.example.com")[0] is True
+            assert validate_public_url("https://flaky.example.com")[0] is False
+
+    def test_risoluzione_scaduta(self):
+        """Dopo il TTL l'hostname viene risolto di nuovo."""
+        with patch("geo_optimizer.utils.validators.socket.getaddrinfo") as mock_dns, patch(
+            "geo_optimizer.utils.validators.time.monotonic"
+        ) as mock_clock:
+            mock_dns.return_value = [(2, 1, 6, "", ("93.184.216.34", 0))]
+            mock_clock.return_value = 1000.0
+            validate_public_url("https://example.com")
+            mock_clock.return_value = 1000.0 + _DNS_CACHE_TTL
+            validate_public_url("https://example.com")
+        assert mock_dns.call_count == 2
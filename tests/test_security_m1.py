@@ -22,6 +22,7 @@ from geo_optimizer.core.schema_injector import generate_astro_snippet
 app_module = pytest.importorskip("geo_optimizer.web.app", reason="FastAPI non installato")
 _MAX_CACHE_SIZE = app_module._MAX_CACHE_SIZE
 _audit_cache = app_module._audit_cache
+_cache_key = app_module._cache_key
 _check_rate_limit = app_module._check_rate_limit
 _evict_expired = app_module._evict_expired
 _rate_limit_store = app_module._rate_limit_store
@@ -125,6 +126,17 @@ class TestCacheLimits:
         # Aggiungi una nuova
         _set_cached("https://new-entry.com", {"score": 99, "band": "excellent"})
         assert len(_audit_cache) <= _MAX_CACHE_SIZE
+        # La più vecchia esce per prima, la nuova entra in coda
+        assert "key-0" not in _audit_cache
+        assert next(reversed(_audit_cache)) == _cache_key("https://new-entry.com")
+
+    def test_riscrittura_sposta_in_coda(self):
+        """Una chiave riscritta diventa la più recente e non fa uscire altre entry."""
+        first = _set_cached("https://a.example", {"score": 1})
+        _set_cached("https://b.example", {"score": 2})
+        assert _set_cached("https://a.example", {"score": 3}) == first
+        assert list(_audit_cache)[-1] == first
+        assert len(_audit_cache) == 2
 
 
 # ============================================================================
@@ -159,6 +171,18 @@ class TestRateLimiting:
         # IP diverso non è limitato
         assert _check_rate_limit("192.0.2.4") is True
 
+    def test_timestamp_scaduti_liberano_la_finestra(self):
+        """Finita la finestra l'IP torna a passare e il buffer non supera il limite."""
+        for _ in range(30):
+            _check_rate_limit("192.0.2.5")
+        buffer = _rate_limit_store["192.0.2.5"]
+        # Simula richieste avvenute oltre la finestra
+        for i in range(len(buffer)):
+            buffer[i] -= app_module._RATE_LIMIT_WINDOW + 1
+        assert _check_rate_limit("192.0.2.5") is True
+        assert len(buffer) == 1
+        assert buffer.maxlen == app_module._RATE_LIMIT_MAX_REQUESTS
+
 
 # ============================================================================
 # #62 — Injection template Astro
@@ -180,6 +204,12 @@ class TestAstroInjection:
         result = generate_astro_snippet("https://safe.com", "`${process.env.SECRET}`")
         assert "${process.env.SECRET}" not in result
 
+    @pytest.mark.parametrize("name", ["$<{x", "$${{x", "$\\{x", "$}{x"])
+    def test_interpolazione_non_si_ricompone(self, name):
+        """Rimuovendo i caratteri intermedi non deve ricomparire '${'."""
+        result = generate_astro_snippet("https://safe.com", name)
+        assert "${" not in result.split('const siteName = "')[1].split('"')[0]
+
     def test_url_troncato(self):
         """URL troppo lungo viene troncato a 200 caratteri."""
         long_url = "https://example.com/" + "A" * 300
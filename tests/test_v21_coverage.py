@@ -39,6 +39,32 @@ from geo_optimizer.models.results import (
     SchemaResult,
 )
 from geo_optimizer.utils.validators import validate_public_url, validate_safe_path
+from tests.conftest import RispostaFinta
+
+# Sitemap statiche, già in bytes come le restituisce response.content
+_XML_INDICE = b"""<?xml version="1.0"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+    <sitemap><loc>https://example.com/sitemap-0.xml</loc></sitemap>
+</sitemapindex>"""
+
+_XML_URLSET_VUOTO = b"""<?xml version="1.0"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+</urlset>"""
+
+_XML_DUE_URL = b"""<?xml version="1.0"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+    <url><loc>https://example.com/pagina1</loc></url>
+    <url><loc>https://example.com/pagina2</loc></url>
+</urlset>"""
+
+_XML_PRIORITY_NON_NUMERICA = b"""<?xml version="1.0"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+    <url>
+        <loc>https://example.com/pagina</loc>
+        <priority>high</priority>
+    </url>
+</urlset>"""
+
 
 # ============================================================================
 # Fixture comune per AuditResult
@@ -148,21 +174,9 @@ class TestFetchSitemapOnStatus:
     @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
     def test_on_status_chiamato_per_sitemap_index(self, mock_crea):
         """Riga 87: on_status chiamato quando viene rilevato un sitemap index."""
-        xml_indice = """<?xml version="1.0"?>
-        <sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-            <sitemap><loc>https://example.com/sitemap-0.xml</loc></sitemap>
-        </sitemapindex>"""
-        xml_vuoto = """<?xml version="1.0"?>
-        <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-        </urlset>"""
-
         mock_sessione = MagicMock()
-        resp_indice = Mock()
-        resp_indice.content = xml_indice.encode()
-        resp_indice.raise_for_status = Mock()
-        resp_vuoto = Mock()
-        resp_vuoto.content = xml_vuoto.encode()
-        resp_vuoto.raise_for_status = Mock()
+        resp_indice = RispostaFinta(content=_XML_INDICE)
+        resp_vuoto = RispostaFinta(content=_XML_URLSET_VUOTO)
         # Prima chiamata → indice, seconda chiamata → sub-sitemap vuoto
         mock_sessione.get.side_effect = [resp_indice, resp_vuoto]
         mock_crea.return_value = mock_sessione
@@ -180,16 +194,8 @@ class TestFetchSitemapOnStatus:
     @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
     def test_on_status_chiamato_con_url_trovati(self, mock_crea):
         """Riga 100: on_status chiamato con il numero di URL trovati."""
-        xml_sitemap = """<?xml version="1.0"?>
-        <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-            <url><loc>https://example.com/pagina1</loc></url>
-            <url><loc>https://example.com/pagina2</loc></url>
-        </urlset>"""
-
         mock_sessione = MagicMock()
-        resp = Mock()
-        resp.content = xml_sitemap.encode()
-        resp.raise_for_status = Mock()
+        resp = RispostaFinta(content=_XML_DUE_URL)
         mock_sessione.get.return_value = resp
         mock_crea.return_value = mock_sessione
 
@@ -215,18 +221,8 @@ class TestPriorityNonNumerica:
     @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
     def test_priority_non_numerica_ignorata(self, mock_crea):
         """Righe 119-120: <priority>high</priority> → ValueError ignorato, priority=0.5."""
-        xml_sitemap = """<?xml version="1.0"?>
-        <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-            <url>
-                <loc>https://example.com/pagina</loc>
-                <priority>high</priority>
-            </url>
-        </urlset>"""
-
         mock_sessione = MagicMock()
-        resp = Mock()
-        resp.content = xml_sitemap.encode()
-        resp.raise_for_status = Mock()
+        resp = RispostaFinta(content=_XML_PRIORITY_NON_NUMERICA)
         mock_sessione.get.return_value = resp
         mock_crea.return_value = mock_sessione
 
@@ -327,6 +323,29 @@ class TestGenerateLlmsTxtFetchTitles:
             )
         mock_fetch.assert_not_called()
 
+    def test_fetch_titles_parallelo_mantiene_ordine_e_fallback(self):
+        """Titoli scaricati in parallelo: ordine preservato, None → url_to_label."""
+        urls = [SitemapUrl(url=f"https://example.com/pagina-{i}") for i in range(6)]
+        urls.append(SitemapUrl(url="https://example.com/con-titolo", title="Già Noto"))
+
+        def finto_fetch(url, session=None):
+            n = int(url.rsplit("-", 1)[1])
+            return None if n == 3 else f"Titolo {n}"
+
+        with patch("geo_optimizer.core.llms_generator.fetch_page_title", side_effect=finto_fetch) as mock_fetch:
+            risultato = generate_llms_txt(
+                "https://example.com",
+                urls,
+                site_name="Test",
+                description="Desc",
+                fetch_titles=True,
+                max_workers=3,
+            )
+        # La pagina con titolo nella sitemap non viene scaricata
+        assert mock_fetch.call_count == 6
+        etichette = [riga.split("]")[0][3:] for riga in risultato.splitlines() if riga.startswith("- [")]
+        assert etichette == ["Titolo 0", "Titolo 1", "Titolo 2", "Pagina 3", "Titolo 4", "Titolo 5", "Già Noto"]
+
 
 # ============================================================================
 # llms_generator.py — sezione Optional in generate_llms_txt (righe 341, 351-357)
@@ -403,12 +422,9 @@ class TestDiscoverSitemapValidazioneSSRF:
         """Righe 407-408: URL sitemap che non passa validate_public_url viene ignorato."""
         mock_sessione = MagicMock()
         # robots.txt con URL sitemap verso IP privato
-        robots_resp = Mock(
-            text="Sitemap: http://192.168.1.1/sitemap.xml",
-            status_code=200,
-        )
+        robots_resp = RispostaFinta(text="Sitemap: http://192.168.1.1/sitemap.xml")
         # Fallback common paths → tutti 404
-        head_resp = Mock(status_code=404)
+        head_resp = RispostaFinta(status_code=404)
         mock_sessione.get.return_value = robots_resp
         mock_sessione.head.return_value = head_resp
         mock_crea.return_value = mock_sessione
@@ -422,11 +438,8 @@ class TestDiscoverSitemapValidazioneSSRF:
     def test_sitemap_dominio_diverso_viene_ignorato(self, mock_crea):
         """Righe 413-414: URL sitemap di dominio esterno viene ignorato."""
         mock_sessione = MagicMock()
-        robots_resp = Mock(
-            text="Sitemap: https://attaccante.com/sitemap.xml",
-            status_code=200,
-        )
-        head_resp = Mock(status_code=404)
+        robots_resp = RispostaFinta(text="Sitemap: https://attaccante.com/sitemap.xml")
+        head_resp = RispostaFinta(status_code=404)
         mock_sessione.get.return_value = robots_resp
         mock_sessione.head.return_value = head_resp
         mock_crea.return_value = mock_sessione
@@ -448,8 +461,8 @@ class TestDiscoverSitemapFallbackCommonPaths:
         """Riga 424-426: common path /sitemap.xml risponde 200 → restituito."""
         mock_sessione = MagicMock()
         # robots.txt senza direttiva Sitemap
-        robots_resp = Mock(text="User-agent: *\nAllow: /", status_code=200)
-        head_ok = Mock(status_code=200)
+        robots_resp = RispostaFinta(text="User-agent: *\nAllow: /")
+        head_ok = RispostaFinta(status_code=200)
         mock_sessione.get.return_value = robots_resp
         mock_sessione.head.return_value = head_ok
         mock_crea.return_value = mock_sessione
@@ -462,8 +475,8 @@ class TestDiscoverSitemapFallbackCommonPaths:
     def test_fallback_nessun_sitemap_trovato_ritorna_none(self, mock_crea):
         """Riga 431: nessun path funziona → on_status callback + ritorna None."""
         mock_sessione = MagicMock()
-        robots_resp = Mock(text="User-agent: *\nAllow: /", status_code=200)
-        head_404 = Mock(status_code=404)
+        robots_resp = RispostaFinta(text="User-agent: *\nAllow: /")
+        head_404 = RispostaFinta(status_code=404)
         mock_sessione.get.return_value = robots_resp
         mock_sessione.head.return_value = head_404
         mock_crea.return_value = mock_sessione
@@ -479,12 +492,12 @@ class TestDiscoverSitemapFallbackCommonPaths:
     def test_fallback_eccezione_head_continua(self, mock_crea):
         """Riga 427: ConnectionError su HEAD → continua al path successivo."""
         mock_sessione = MagicMock()
-        robots_resp = Mock(text="User-agent: *", status_code=200)
+        robots_resp = RispostaFinta(text="User-agent: *")
         # Prima head lancia eccezione, la seconda risponde 200
         mock_sessione.get.return_value = robots_resp
         mock_sessione.head.side_effect = [
             ConnectionError("Timeout"),
-            Mock(status_code=200),
+            RispostaFinta(status_code=200),
         ]
         mock_crea.return_value = mock_sessione
 
@@ -496,8 +509,8 @@ class TestDiscoverSitemapFallbackCommonPaths:
     def test_on_status_chiamato_quando_sitemap_trovato_in_common_path(self, mock_crea):
         """Riga 424: on_status chiamato quando sitemap trovato via common path."""
         mock_sessione = MagicMock()
-        robots_resp = Mock(text="User-agent: *", status_code=200)
-        head_ok = Mock(status_code=200)
+        robots_resp = RispostaFinta(text="User-agent: *")
+        head_ok = RispostaFinta(status_code=200)
         mock_sessione.get.return_value = robots_resp
         mock_sessione.head.return_value = head_ok
         mock_crea.return_value = mock_sessione
@@ -791,23 +804,16 @@ class TestSchemaCmdPrintAnalysis:
 # ============================================================================
 
 
-class TestSchemaCmdFaqOltreTre:
-    """Verifica che _print_analysis mostri '... and N more' con > 3 FAQ."""
-
-    def test_riga_198_piu_di_tre_faq_mostra_contatore(self):
-        """Riga 198: più di 3 FAQ estratte → riga '... and X more'."""
-        runner = CliRunner()
-        # Crea un HTML con 5 blocchi details/summary per far estrarre 5 FAQ
-        faq_blocks = "\n".join([
-            f"""<details>
+# 5 blocchi details/summary per far estrarre 5 FAQ, oltre a un FAQPage già presente
+_BLOCCHI_CINQUE_FAQ = "\n".join(
+    f"""<details>
                 <summary>Domanda {i}: cosa fa la funzione {i}?</summary>
                 <p>La funzione {i} esegue operazioni di elaborazione dati avanzate</p>
             </details>"""
-            for i in range(1, 6)
-        ])
-        with runner.isolated_filesystem():
-            with open("test.html", "w") as f:
-                f.write(f"""<html><head>
+    for i in range(1, 6)
+)
+
+_PAGINA_CINQUE_FAQ = f"""<html><head>
                 <script type="application/ld+json">
                 {{
                     "@context": "https://schema.org",
@@ -822,9 +828,19 @@ class TestSchemaCmdFaqOltreTre:
                 }}
                 </script>
                 </head><body>
-                {faq_blocks}
-                </body></html>""")
-            result = runner.invoke(schema, ["--file", "test.html", "--analyze"])
+                {_BLOCCHI_CINQUE_FAQ}
+                </body></html>"""
+
+
+class TestSchemaCmdFaqOltreTre:
+    """Verifica che _print_analysis mostri '... and N more' con > 3 FAQ."""
+
+    def test_riga_198_piu_di_tre_faq_mostra_contatore(self, tmp_path):
+        """Riga 198: più di 3 FAQ estratte → riga '... and X more'."""
+        runner = CliRunner()
+        pagina = tmp_path / "test.html"
+        pagina.write_text(_PAGINA_CINQUE_FAQ)
+        result = runner.invoke(schema, ["--file", str(pagina), "--analyze"])
         assert result.exit_code == 0
         # Se ci sono più di 3 FAQ, deve mostrare "... and X more"
         if "more" in result.output:
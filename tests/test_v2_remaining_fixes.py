@@ -12,14 +12,50 @@ Copre:
 - #14 extract_faq_from_html non muta il tree BeautifulSoup
 """
 
-from unittest.mock import MagicMock, Mock, patch
+from types import SimpleNamespace
+from unittest.mock import patch
 
+import pytest
 from bs4 import BeautifulSoup
 
 from geo_optimizer.core.audit import audit_llms_txt, audit_robots_txt, audit_schema
 from geo_optimizer.core.llms_generator import fetch_page_title, fetch_sitemap
 from geo_optimizer.core.schema_injector import extract_faq_from_html
 from geo_optimizer.utils.http import fetch_url
+from tests.conftest import RispostaFinta
+
+# ============================================================================
+# Risposte HTTP condivise: immutabili, costruite una volta per modulo
+# ============================================================================
+
+_RESP_403 = RispostaFinta(status_code=403, text="Forbidden")
+_RESP_500 = RispostaFinta(status_code=500, text="Error")
+_RESP_301 = RispostaFinta(status_code=301, text="Moved")
+_RESP_ROBOTS_200 = RispostaFinta(text="User-agent: *\nAllow: /")
+_RESP_LLMS_200 = RispostaFinta(
+    text="# Site\n\n> Description\n\n## Pages\n\n- [Home](https://example.com)",
+)
+
+_RESP_TITOLO_404 = RispostaFinta(status_code=404, text="<html><title>Page Not Found</title></html>")
+_RESP_TITOLO_500 = RispostaFinta(status_code=500, text="<html><title>Internal Server Error</title></html>")
+_RESP_TITOLO_200 = RispostaFinta(text="<html><title>Real Title</title></html>")
+
+_RESP_CONTENT_LENGTH_ENORME = RispostaFinta(headers={"Content-Length": "999999999"}, content=b"x")
+_RESP_BODY_ENORME = RispostaFinta(content=b"x" * 2048)
+_RESP_ENTRO_LIMITE = RispostaFinta(content=b"OK")
+
+_RESP_SITEMAP_UNA_PAGINA = RispostaFinta(
+    content=b"""<?xml version="1.0"?>
+        <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+            <url><loc>https://example.com/page1</loc></url>
+        </urlset>""",
+)
+
+
+def _sessione_con(resp):
+    """Sessione finta il cui get() restituisce sempre *resp*."""
+    return SimpleNamespace(get=lambda *args, **kwargs: resp)
+
 
 # ============================================================================
 # #12 — audit_robots_txt / audit_llms_txt ignorano non-200
@@ -29,46 +65,30 @@ from geo_optimizer.utils.http import fetch_url
 class TestStatusCodeValidation:
     """Solo risposte HTTP 200 vengono parsate come contenuto valido."""
 
+    @pytest.mark.parametrize(
+        "resp, trovato",
+        [(_RESP_403, False), (_RESP_500, False), (_RESP_ROBOTS_200, True)],
+        ids=["403", "500", "200"],
+    )
     @patch("geo_optimizer.core.audit.fetch_url")
-    def test_robots_403_non_parsato(self, mock_fetch):
-        """robots.txt con status 403 non viene trattato come trovato."""
-        mock_fetch.return_value = (Mock(status_code=403, text="Forbidden"), None)
+    def test_robots_solo_200_parsato(self, mock_fetch, resp, trovato):
+        """robots.txt viene trattato come trovato solo con status 200."""
+        mock_fetch.return_value = (resp, None)
         result = audit_robots_txt("https://example.com")
-        assert result.found is False
-
-    @patch("geo_optimizer.core.audit.fetch_url")
-    def test_robots_500_non_parsato(self, mock_fetch):
-        """robots.txt con status 500 non viene trattato come trovato."""
-        mock_fetch.return_value = (Mock(status_code=500, text="Error"), None)
-        result = audit_robots_txt("https://example.com")
-        assert result.found is False
+        assert result.found is trovato
 
+    @pytest.mark.parametrize("resp", [_RESP_403, _RESP_301], ids=["403", "301"])
     @patch("geo_optimizer.core.audit.fetch_url")
-    def test_robots_200_parsato(self, mock_fetch):
-        """robots.txt con status 200 viene parsato normalmente."""
-        mock_fetch.return_value = (Mock(status_code=200, text="User-agent: *\nAllow: /"), None)
-        result = audit_robots_txt("https://example.com")
-        assert result.found is True
-
-    @patch("geo_optimizer.core.audit.fetch_url")
-    def test_llms_403_non_parsato(self, mock_fetch):
-        """llms.txt con status 403 non viene trattato come trovato."""
-        mock_fetch.return_value = (Mock(status_code=403, text="Forbidden"), None)
-        result = audit_llms_txt("https://example.com")
-        assert result.found is False
-
-    @patch("geo_optimizer.core.audit.fetch_url")
-    def test_llms_301_non_parsato(self, mock_fetch):
-        """llms.txt con redirect 301 non viene trattato come trovato."""
-        mock_fetch.return_value = (Mock(status_code=301, text="Moved"), None)
+    def test_llms_non_200_non_parsato(self, mock_fetch, resp):
+        """llms.txt con errore o redirect non viene trattato come trovato."""
+        mock_fetch.return_value = (resp, None)
         result = audit_llms_txt("https://example.com")
         assert result.found is False
 
     @patch("geo_optimizer.core.audit.fetch_url")
     def test_llms_200_parsato(self, mock_fetch):
         """llms.txt con status 200 viene parsato normalmente."""
-        content = "# Site\n\n> Description\n\n## Pages\n\n- [Home](https://example.com)"
-        mock_fetch.return_value = (Mock(status_code=200, text=content), None)
+        mock_fetch.return_value = (_RESP_LLMS_200, None)
         result = audit_llms_txt("https://example.com")
         assert result.found is True
         assert result.has_h1 is True
@@ -82,32 +102,16 @@ class TestStatusCodeValidation:
 class TestFetchPageTitleStatusCheck:
     """fetch_page_title ritorna None per pagine di errore."""
 
+    @pytest.mark.parametrize(
+        "resp, titolo",
+        [(_RESP_TITOLO_404, None), (_RESP_TITOLO_500, None), (_RESP_TITOLO_200, "Real Title")],
+        ids=["404", "500", "200"],
+    )
     @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
-    def test_404_ritorna_none(self, mock_create):
-        mock_session = MagicMock()
-        mock_resp = Mock(status_code=404, text="<html><title>Page Not Found</title></html>")
-        mock_session.get.return_value = mock_resp
-        mock_create.return_value = mock_session
-
-        assert fetch_page_title("https://example.com/missing") is None
-
-    @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
-    def test_500_ritorna_none(self, mock_create):
-        mock_session = MagicMock()
-        mock_resp = Mock(status_code=500, text="<html><title>Internal Server Error</title></html>")
-        mock_session.get.return_value = mock_resp
-        mock_create.return_value = mock_session
+    def test_titolo_solo_da_pagine_200(self, mock_create, resp, titolo):
+        mock_create.return_value = _sessione_con(resp)
 
-        assert fetch_page_title("https://example.com/broken") is None
-
-    @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
-    def test_200_ritorna_titolo(self, mock_create):
-        mock_session = MagicMock()
-        mock_resp = Mock(status_code=200, text="<html><title>Real Title</title></html>")
-        mock_session.get.return_value = mock_resp
-        mock_create.return_value = mock_session
-
-        assert fetch_page_title("https://example.com/page") == "Real Title"
+        assert fetch_page_title("https://example.com/page") == titolo
 
 
 # ============================================================================
@@ -125,7 +129,7 @@ class TestRawSchemasDuplication:
         {"@type": ["WebSite", "WebApplication"], "name": "Test", "url": "https://example.com"}
         </script>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_schema(soup, "https://example.com")
 
         assert len(result.found_types) == 2
@@ -146,7 +150,7 @@ class TestRawSchemasDuplication:
         {"@type": "FAQPage", "mainEntity": []}
         </script>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         result = audit_schema(soup, "https://example.com")
 
         assert len(result.found_types) == 2
@@ -161,49 +165,24 @@ class TestRawSchemasDuplication:
 class TestResponseSizeLimit:
     """fetch_url rifiuta risposte troppo grandi."""
 
+    @pytest.mark.parametrize(
+        "resp",
+        [_RESP_CONTENT_LENGTH_ENORME, _RESP_BODY_ENORME],
+        ids=["content-length", "body"],
+    )
     @patch("geo_optimizer.utils.http.create_session_with_retry")
-    def test_content_length_troppo_grande(self, mock_create):
-        """Content-Length header superiore al limite → errore."""
-        mock_session = MagicMock()
-        mock_resp = Mock(
-            status_code=200,
-            headers={"Content-Length": "999999999"},
-            content=b"x",
-        )
-        mock_session.get.return_value = mock_resp
-        mock_create.return_value = mock_session
-
-        resp, err = fetch_url("https://example.com", max_size=1024)
-        assert resp is None
-        assert "too large" in err.lower()
-
-    @patch("geo_optimizer.utils.http.create_session_with_retry")
-    def test_body_troppo_grande(self, mock_create):
-        """Body effettivo superiore al limite → errore."""
-        mock_session = MagicMock()
-        mock_resp = Mock(
-            status_code=200,
-            headers={},
-            content=b"x" * 2048,
-        )
-        mock_session.get.return_value = mock_resp
-        mock_create.return_value = mock_session
+    def test_risposta_troppo_grande(self, mock_create, resp):
+        """Content-Length o body effettivo oltre il limite → errore."""
+        mock_create.return_value = _sessione_con(resp)
 
-        resp, err = fetch_url("https://example.com", max_size=1024)
-        assert resp is None
+        risposta, err = fetch_url("https://example.com", max_size=1024)
+        assert risposta is None
         assert "too large" in err.lower()
 
     @patch("geo_optimizer.utils.http.create_session_with_retry")
     def test_risposta_entro_limite(self, mock_create):
         """Risposta entro il limite → successo."""
-        mock_session = MagicMock()
-        mock_resp = Mock(
-            status_code=200,
-            headers={},
-            content=b"OK",
-        )
-        mock_session.get.return_value = mock_resp
-        mock_create.return_value = mock_session
+        mock_create.return_value = _sessione_con(_RESP_ENTRO_LIMITE)
 
         resp, err = fetch_url("https://example.com", max_size=1024)
         assert resp is not None
@@ -229,16 +208,7 @@ class TestSitemapDepthLimit:
     @patch("geo_optimizer.core.llms_generator.create_session_with_retry")
     def test_profondita_zero_funziona(self, mock_create):
         """Profondità 0 processa normalmente la sitemap."""
-        sitemap_xml = """<?xml version="1.0"?>
-        <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-            <url><loc>https://example.com/page1</loc></url>
-        </urlset>"""
-        mock_session = MagicMock()
-        mock_resp = Mock()
-        mock_resp.content = sitemap_xml.encode()
-        mock_resp.raise_for_status = Mock()
-        mock_session.get.return_value = mock_resp
-        mock_create.return_value = mock_session
+        mock_create.return_value = _sessione_con(_RESP_SITEMAP_UNA_PAGINA)
 
         result = fetch_sitemap("https://example.com/sitemap.xml", _depth=0)
         assert len(result) == 1
@@ -261,7 +231,7 @@ class TestExtractFaqNoMutation:
             Making websites visible to AI search engines like ChatGPT and Perplexity
         </details>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         original_html = str(soup)
 
         faqs = extract_faq_from_html(soup)
@@ -280,7 +250,7 @@ class TestExtractFaqNoMutation:
             <p>The audit checks robots.txt, llms.txt, schema, meta tags and content quality</p>
         </div>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         original_html = str(soup)
 
         faqs = extract_faq_from_html(soup)
@@ -302,12 +272,12 @@ class TestSitemapUrlValidation:
         """URL sitemap dello stesso dominio viene accettato."""
         from geo_optimizer.core.llms_generator import discover_sitemap
 
-        mock_session = MagicMock()
-        robots_resp = Mock(text="Sitemap: https://example.com/sitemap.xml", status_code=200)
-        head_resp = Mock(status_code=200)
-        mock_session.get.return_value = robots_resp
-        mock_session.head.return_value = head_resp
-        mock_create.return_value = mock_session
+        robots_resp = RispostaFinta(text="Sitemap: https://example.com/sitemap.xml")
+        head_resp = RispostaFinta()
+        mock_create.return_value = SimpleNamespace(
+            get=lambda *args, **kwargs: robots_resp,
+            head=lambda *args, **kwargs: head_resp,
+        )
 
         with patch("geo_optimizer.core.llms_generator.validate_public_url", return_value=(True, None)):
             result = discover_sitemap("https://example.com")
@@ -318,16 +288,13 @@ class TestSitemapUrlValidation:
         """URL sitemap di un dominio diverso viene ignorato."""
         from geo_optimizer.core.llms_generator import discover_sitemap
 
-        mock_session = MagicMock()
-        robots_resp = Mock(
-            text="Sitemap: https://evil.com/malicious-sitemap.xml",
-            status_code=200,
-        )
+        robots_resp = RispostaFinta(text="Sitemap: https://evil.com/malicious-sitemap.xml")
         # Se il sitemap esterno viene rifiutato, deve cadere ai common paths
-        head_resp = Mock(status_code=404)
-        mock_session.get.return_value = robots_resp
-        mock_session.head.return_value = head_resp
-        mock_create.return_value = mock_session
+        head_resp = RispostaFinta(status_code=404)
+        mock_create.return_value = SimpleNamespace(
+            get=lambda *args, **kwargs: robots_resp,
+            head=lambda *args, **kwargs: head_resp,
+        )
 
         result = discover_sitemap("https://example.com")
         # Non deve restituire il sitemap maligno